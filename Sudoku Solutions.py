@@ -25,8 +25,10 @@ import os
 import sys
 import copy
 import time
-from Queue import PriorityQueue
-from Queue import Queue
+import heapq
+from collections import deque
+from Sudoku_Peers import getPeers
+from Sudoku_Reader import readPuzzles
 
 class SudokuSolver():
     
@@ -39,6 +41,10 @@ class SudokuSolver():
         
         #Heuristics related
         self.blankValues={} #Initialize the dictionary for heuristic
+        self.mrvHeap=None #Heap of ((remaining values, -degree, blank), blank), may hold outdated entries
+        self.mrvKeys={} #The current heap key of every blank
+        self.arcConsistent=False #True once blankValues went through a full AC3 pass
+        self.journal=[] #(blank, domain) pairs saved before a domain was changed, see saveDomain
                        
         #Initialize the metrics
         self.pathLengths=[] #Hold all the path lengths for metrics
@@ -166,6 +172,7 @@ class SudokuSolver():
                 self.blanks.remove(nextBlank)
                 self.currentPathLength+=1
                 self.puzzle[row][col] = num
+                self.updateMRV(nextBlank)
                 result=self.backTrackHeuristic()
                 if result!=None:    
                    return
@@ -175,6 +182,7 @@ class SudokuSolver():
                 self.pathLengths.append(self.currentPathLength)
                 self.blanks.append(nextBlank)
                 self.puzzle[row][col]=0 
+                self.updateMRV(nextBlank)
                 
         return None
     
@@ -235,6 +243,7 @@ class SudokuSolver():
             if (consistent==True): #Assign a value and recurse if domain processing returned true
                 self.blanks.remove(blank)
                 self.puzzle[row][col] = num
+                self.updateMRV(blank)
                 self.currentPathLength+=1
                 
                 result=self.forwardCheckHeuristic()
@@ -246,6 +255,7 @@ class SudokuSolver():
                 #Backtrack
                 self.blanks.append(blank)
                 self.puzzle[row][col]=0
+                self.updateMRV(blank)
                 self.pathLengths.append(self.currentPathLength) #Add the current path length to the overall list.
                 self.currentPathLength-=1
         return None
@@ -267,12 +277,18 @@ class SudokuSolver():
         blankDomain=copy.deepcopy(self.blankValues[blank])
 
         for num in blankDomain:
-            tempDomain=copy.deepcopy(self.blankValues) #Copy of current domain before pruning
+            mark=len(self.journal) #Domains changed from here on can be restored by popping the journal to mark
+            tempConsistent=self.arcConsistent
+            self.saveDomain(blank)
             self.blankValues[blank]=[num]
-            #Propagate the constraints
-            self.propagateConstraints()
+            #Propagate the constraints; once the domains are arc consistent only the arcs into blank can fail
+            if self.arcConsistent:
+                self.propagateConstraints(blank)
+            else:
+                self.propagateConstraints()
             #Assign value
             self.puzzle[row][col]=num
+            self.updateMRV(blank)
             
             self.currentPathLength+=1
             self.blanks.remove(blank)   
@@ -281,9 +297,11 @@ class SudokuSolver():
             if result!=None:
                 return
             #Restore the domain and backtrack
-            self.blankValues=tempDomain
+            self.restoreDomains(mark)
+            self.arcConsistent=tempConsistent
             self.blanks.append(blank)
             self.puzzle[row][col]=0
+            self.updateMRV(blank)
             self.pathLengths.append(self.currentPathLength) #Add the current path length to the overall list.
             self.currentPathLength-=1
         return None
@@ -352,37 +370,65 @@ class SudokuSolver():
     '''
     Get the most constrained blank (least number of possible values) with max degree
     MRV+MD
+    The heap is built on the first call and afterwards only the blanks next to
+    a changed square are re-keyed (see updateMRV), so outdated entries are
+    skipped here.
     '''
     def getMRV(self):
+        if self.mrvHeap is None:
+            self.rebuildMRV()
+            
+        while True:
+            key, blank = self.mrvHeap[0]
+            if self.mrvKeys.get(blank) == key:
+                return blank
+            heapq.heappop(self.mrvHeap) #Outdated entry
+            
+    '''
+    Heap key of a blank: fewest possible values first, then highest degree,
+    then the lowest (row, col) like the old queue order.
+    '''
+    def getMRVKey(self, blank):
+        possible=self.getPossibleValues(blank, True)
+        return (len(possible), -len(self.getNeighborBlanks(blank)), blank)
+    
+    '''
+    Build the MRV heap from scratch for the current blanks
+    '''
+    def rebuildMRV(self):
+        self.mrvKeys={}
+        for blank in self.getEmptyCells(self.puzzle):
+            self.mrvKeys[blank]=self.getMRVKey(blank)
+        self.mrvHeap=[(blankKey, square) for square, blankKey in self.mrvKeys.items()]
+        heapq.heapify(self.mrvHeap)
+            
+    '''
+    Re-key the MRV heap after the square blank got a value or was cleared.
+    Only the square itself and its blank neighbors can change priority.
+    '''
+    def updateMRV(self, blank):
+        if self.mrvHeap is None:
+            return
+        row=blank[0]
+        col=blank[1]
         
-        #Build the MRV priority queue
-        q = PriorityQueue()
-        for blank in self.blanks:
-            possible = self.getPossibleValues(blank, True)
-            q.put((len(possible), blank))
-
-        #Get the first one among (possibly equal)
-        blanks = []
-        blanks.append(q.get())
-        minVal = blanks[0][0]
-
-        #Build max Degree list
-        while not q.empty(): #Get all equally-prioritized blanks
-            next = q.get()
-            if next[0] == minVal:
-                blanks.append(next)
-            else:
-                break
+        changed=self.getNeighborBlanks(blank)
+        if self.puzzle[row][col]==0:
+            changed.append(blank)
+        else:
+            self.mrvKeys.pop(blank, None)
             
-        maxDeg = len(self.getNeighborBlanks(blanks[0][1]))
-        maxDegBlank = blanks[0]
-
-        for blank in blanks:
-            degree = len(self.getNeighborBlanks(blank[1]))
-            if degree > maxDeg:
-                maxDegBlank = blank
-                maxDeg = degree
-        return maxDegBlank[1]
+        for cell in changed:
+            key=self.getMRVKey(cell)
+            if self.mrvKeys.get(cell)!=key:
+                self.mrvKeys[cell]=key
+                heapq.heappush(self.mrvHeap, (key, cell))
+        
+        #Drop the outdated entries once they outnumber the live ones
+        if len(self.mrvHeap)>4*len(self.mrvKeys)+81:
+            self.mrvHeap=[(liveKey, liveCell) for liveCell, liveKey in self.mrvKeys.items()]
+            heapq.heapify(self.mrvHeap)
+        
     '''
     Preprocessing for forward checking
     '''
@@ -420,39 +466,82 @@ class SudokuSolver():
     '''
     Propagates current constraints on the entire
     grid via AC3
-    '''
-    def propagateConstraints(self):
-        queue=Queue() #Build a queue of all arcs in the grid
-        for blank in self.blanks:
-            neighbors=self.getNeighborBlanks(blank)
+    Without a changed blank every arc of the grid is queued. With one, the
+    domains were arc consistent before it changed, so only the arcs into it
+    are queued. An arc is never queued twice.
+    '''
+    def propagateConstraints(self, changed=None):
+        queue=deque()
+        queued=set()
+        if changed is None:
+            blanks=self.blanks #Build a queue of all arcs in the grid
+        else:
+            blanks=self.getNeighborBlanks(changed) #Build a queue of the arcs into the changed blank
+        for blank in blanks:
+            if changed is None:
+                neighbors=self.getNeighborBlanks(blank)
+            else:
+                neighbors=[changed]
             for neighbor in neighbors:
-                queue.put((blank, neighbor))
+                queue.append((blank, neighbor))
+                queued.add((blank, neighbor))
 
-        while not queue.empty():
-            arc=queue.get()
+        while queue:
+            arc=queue.popleft()
+            queued.discard(arc)
             orig=arc[0]
             dest=arc[1]
             if self.removeInconsistencies(orig, dest): #Removal occurred from orig
                 neighbors=self.getNeighborBlanks(orig) #Go through neighbors, add an arc from neighbor->orig to detect possible inconsistencies
                 neighbors.remove(dest)
                 for neighbor in neighbors:
-                    queue.put((neighbor, orig))
+                    if (neighbor, orig) not in queued:
+                        queue.append((neighbor, orig))
+                        queued.add((neighbor, orig))
+        self.arcConsistent=True
 
     '''
     AC3
     Deletes values in orig that are not compatible with dest 
+    For the all-different constraint a value of orig only loses its
+    support when dest has no other value left, so dest has to be
+    empty or hold just that value.
     '''
     def removeInconsistencies(self, orig, dest):
-        removed=False
-        originDomain=copy.deepcopy(self.blankValues[orig])
-        for val in originDomain:
-            neighborDomain=copy.deepcopy(self.blankValues[dest])
-            if val in neighborDomain: 
-                neighborDomain.remove(val)                
-            if len(neighborDomain)==0: #Any value of original domain caused neighbor domain to become 0
-                self.blankValues[orig].remove(val)
-                removed=True
-        return removed
+        destDomain=self.blankValues[dest]
+        if len(destDomain)>1:
+            return False
+        originDomain=self.blankValues[orig]
+        if len(destDomain)==0: #Every value of orig leaves dest empty
+            removed=len(originDomain)>0
+            if removed:
+                self.saveDomain(orig)
+                self.blankValues[orig]=[]
+            return removed
+        val=destDomain[0]
+        if val in originDomain:
+            self.saveDomain(orig)
+            self.blankValues[orig].remove(val)
+            return True
+        return False
+    '''
+    Journal the domain of blank before it gets changed. The saved list is
+    left alone and blank gets a copy to change, so restoring only has to
+    put the saved lists back, at a cost of what changed since the mark.
+    '''
+    def saveDomain(self, blank):
+        domain=self.blankValues[blank]
+        self.journal.append((blank, domain))
+        self.blankValues[blank]=list(domain)
+        
+    '''
+    Undo every domain change journaled since the journal had length mark
+    '''
+    def restoreDomains(self, mark):
+        while len(self.journal)>mark:
+            blank, domain=self.journal.pop()
+            self.blankValues[blank]=domain
+            
     '''
     Generic method to end the algorithm in process,
     calculate the running time, output the solution file, 
@@ -499,50 +588,13 @@ class SudokuSolver():
         row=blank[0]
         col=blank[1]
         
+        #The peer table is already deduplicated, so only the blanks need picking out
         neighbors=[]
-        associatedBlanks=self.getRowBlanks(row)+self.getColumnBlanks(col)+self.getBoxBlanks(row, col)
-        for blank in associatedBlanks:
-            if blank not in neighbors and blank!=(row,col): 
-                #Might be that box collided with row / col so check here
-                neighbors.append(blank)
+        for neighbor in getPeers(9).peers[row][col]:
+            if self.puzzle[neighbor[0]][neighbor[1]]==0:
+                neighbors.append(neighbor)
         return neighbors
         
-    '''
-    Get neighboring cells in row
-    '''
-    def getRowBlanks(self, row):
-        cells=[]
-        for col in range(9):
-            if self.puzzle[row][col]==0:
-                cells.append((row, col))
-        return cells
-    
-    '''
-    Get neighboring cells in column
-    '''
-    def getColumnBlanks(self, col ):
-        cells=[]
-        for row in range(9):
-            if self.puzzle[row][col]==0:    
-                cells.append((row,col))
-        
-        return cells
-    
-    '''
-    Get neighboring cells in box
-    '''
-    def getBoxBlanks(self, row, col):       
-        cells=[]
-        row=(row/3)*3
-        col=(col/3)*3
-        
-        for r in range(3):
-            for c in range(3):
-                if self.puzzle[row+r][col+c]==0:
-                    cells.append((row+r,col+c))
-                    
-        return cells
-
 #######################################################
 # I/O HELPERS                                         #
 #######################################################
@@ -639,24 +691,29 @@ class SudokuSolver():
     '''
     def loadPuzzle(self, puzzleFile):
         possibleTokens=[1, 2, 3, 4, 5, 6, 7, 8, 9, 0]
-        puzzle=open(puzzleFile, 'r')
-        puzzleText=puzzle.readlines()
+        puzzles=readPuzzles(puzzleFile, 'grid') #Only the first board of the file is solved
+        try:
+            board=next(puzzles)
+        except ValueError, error:
+            print "Improper file format! "+str(error)
+            sys.exit(1)
+        except StopIteration:
+            print "Improper file format! The file holds no puzzle"
+            sys.exit(1)
+        finally:
+            puzzles.close()
+        if len(board)!=9:
+            print "Improper file format! Line length must always be 9"
+            sys.exit(1)
         for row in range (9):
-            lineTokens=puzzleText[row].split()
-            if len(lineTokens)!=9:
-                print "Improper file format! Line length must always be 9"
-                sys.exit(1)
             for col in range(9):
-                token=lineTokens[col].split()[0].strip()
-                if token=='-':  
-                    token=0 # Change the '-'s to 0s
-                token=int(token)
+                token=board[row][col]
                 if token not in possibleTokens:
                     print "Invalid token found"
                     print "Token: "+str(token)+" possible: ", possibleTokens
                     sys.exit(1)
                     
-                self.puzzle[row][col]=int(token)
+                self.puzzle[row][col]=token
         print ""
                 
     '''
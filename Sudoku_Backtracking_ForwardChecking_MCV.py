@@ -1,34 +1,8 @@
 #!/usr/bin/env python
 import struct, string, math, copy
 from time import time
+from Sudoku_Board import SudokuBoard
 
-# this will be the game object your player will manipulate
-class SudokuBoard:
-
-    # the constructor for the SudokuBoard
-    def __init__( self, size, board, numChecks ):
-      self.BoardSize = size #the size of the board
-      self.CurrentGameboard= board #the current state of the game board
-      self.numChecks = numChecks
-
-    # This function will create a new sudoku board object
-    # with the input value placed on the GameBoard row and col are
-    # both zero-indexed
-    def set_value( self, row, col, value ):
-        self.CurrentGameboard[row][col]=value #add the value to the appropriate position on the board
-        return SudokuBoard( self.BoardSize, self.CurrentGameboard, self.numChecks ) #return a new board of the same size with the value added
-
-    def __repr__(self):
-        """ returns a string representation for a SudokuBoard """
-        s = dashes = "".join([ ' -' for i in range(self.BoardSize) ])
-        for row in range( self.BoardSize ):
-            sRow = '|'
-            for col in range( self.BoardSize ):
-                sRow += str(self.CurrentGameboard[row][col]) + '|'
-            s += '\n' + sRow + '\n' + dashes
-        return s
-
-    
 # parse_file
 # this function will parse a sudoku text file (like those posted on the website)
 # into a BoardSize, and a 2d array [row,col] which holds the value of each cell.
@@ -83,7 +57,7 @@ def isConsistent( BoardArray, testCellRow, testCellCol, testCellVal ):
 def getUnassignedVar( sudoku ):
     for row in range(sudoku.BoardSize):
         for col in range(sudoku.BoardSize):
-            if ( sudoku.CurrentGameboard[row][col] == 0 ): return row, col
+            if ( sudoku.get_value(row, col) == 0 ): return row, col
     return -1, -1
 
 
@@ -101,7 +75,7 @@ def backtracking( sudoku ):
     # try different values for a cell
     for value in range( 1, sudoku.BoardSize+1 ):
         sudoku.numChecks += 1
-        if isConsistent( sudoku.CurrentGameboard, row, col, value ):
+        if sudoku.is_consistent( row, col, value ):
             sudoku.set_value( row, col, value )
             if ( backtracking( sudoku ) ): return True
         sudoku.set_value( row, col, 0 )
@@ -122,7 +96,7 @@ def initialPoss( sudoku ):
     poss = [[range(1,sudoku.BoardSize+1) for row in range(sudoku.BoardSize)] for col in range(sudoku.BoardSize)]
     for row in range(sudoku.BoardSize):
         for col in range(sudoku.BoardSize):
-            value = sudoku.CurrentGameboard[row][col]
+            value = sudoku.get_value(row, col)
             if (value != 0): # check for cells already assigned
  #               poss[row][col] = [] # no possibilities for cells already assigned
                 poss = updatePoss ( sudoku, poss, row, col, value, 'removePoss' ) # update cells in same row, column, and grid
@@ -138,10 +112,10 @@ def updatePoss( sudoku, poss, currentRow, currentCol, value, action ):
             if ( value in poss[currentRow][i] ): poss[currentRow][i].remove(value)
             if ( value in poss[i][currentCol] ): poss[i][currentCol].remove(value)
         elif action == 'addPoss':
-            if ( isConsistent(sudoku.CurrentGameboard, currentRow, i, value) \
+            if ( sudoku.is_consistent( currentRow, i, value ) \
                  and (value not in poss[currentRow][i]) ):
                 poss[currentRow][i].append(value)
-            if ( isConsistent(sudoku.CurrentGameboard, i, currentCol, value) \
+            if ( sudoku.is_consistent( i, currentCol, value ) \
                  and (value not in poss[i][currentCol]) ):
                 poss[i][currentCol].append(value)
             
@@ -157,7 +131,7 @@ def updatePoss( sudoku, poss, currentRow, currentCol, value, action ):
             if( value in poss[row][col] and action == 'removePoss' ):
                 poss[row][col].remove(value)
             elif ( action == 'addPoss' and (value not in poss[row][col]) and \
-                   isConsistent( sudoku.CurrentGameboard, row, col, value ) ): 
+                   sudoku.is_consistent( row, col, value ) ): 
                 poss[row][col].append(value)
     return poss
 #----------------MCV and LCVal-----------------
@@ -167,7 +141,7 @@ def mostConstrainedVariable(poss, sudoku):
     for x in range(size):
         for y in range(size):
             if ((len(poss[x][y])) == 1):
-                    sudoku.set_value(x,y,(poss[x][y]))
+                    sudoku.set_value(x,y,(poss[x][y][0]))
             if ((len(poss[x][y]) < smallest) and (len(poss[x][y]) > 1)):
                 smallest = len(poss[x][y])
                 tempx = x
@@ -220,7 +194,7 @@ def forwardChecking( sudoku, poss ):
     for value in possCopy:
         
         
-        if isConsistent( sudoku.CurrentGameboard, row, col, value ):
+        if sudoku.is_consistent( row, col, value ):
             sudoku.set_value( row, col, value )
             sudoku.numChecks += 1
             updatePoss( sudoku, poss, row, col, value, 'removePoss' )
@@ -239,7 +213,7 @@ def MCV_Row_Col(sudoku, poss):
     MCVcol = -1
     for row in range(sudoku.BoardSize):         # Loop through the sudoku board for zeros (blanks)
         for col in range(sudoku.BoardSize):
-            if ( sudoku.CurrentGameboard[row][col] == 0 ):  # if a zero (blank) is found
+            if ( sudoku.get_value(row, col) == 0 ):  # if a zero (blank) is found
                 if (len(poss[row][col])<Min_Length):        # if the length of possibilities is less than the Min_Length we found so far    
                     Min_Length = len(poss[row][col])        # Then assign this value to Min_Length
                     MCVrow = row                            # Row of MCV
@@ -264,7 +238,7 @@ def MCV (sudoku, poss):
     for value in possCopy:
         
         
-        if isConsistent( sudoku.CurrentGameboard, row, col, value ):    # If the assignment is consistent
+        if sudoku.is_consistent( row, col, value ):    # If the assignment is consistent
             sudoku.set_value( row, col, value )
             sudoku.numChecks += 1
             updatePoss( sudoku, poss, row, col, value, 'removePoss' )
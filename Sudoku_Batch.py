@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+# Solves every board matched by a set of directories and globs with one of the algorithms of
+# Sudoku_Benchmark, spread over a pool of worker processes. Results are printed as each board
+# finishes (so not in input order), followed by the totals.
+# Every board of a corpus (see Sudoku_Corpus) is a job of its own: the workers map the corpus and
+# read the boards they are given by number, so no board is sent to them.
+#
+# Usage: python Sudoku_Batch.py [-a algorithm] [-j workers] [-t seconds] path_or_glob ...
+# e.g.   python Sudoku_Batch.py -a MCV_Rules -j 4 'ExtraExamples/*/*.sudoku*' puzzles.corpus
+import os, sys, glob, argparse, multiprocessing
+from time import time
+import Sudoku_Benchmark
+from Sudoku_Corpus import openCorpus, isCorpus
+
+
+# the board files named by a list of directories (searched recursively) and glob patterns, sorted
+def puzzlePaths( patterns ):
+    paths = set()
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            for directory, subdirectories, names in os.walk(pattern):
+                paths.update(os.path.join(directory, name) for name in names if '.sudoku' in name)
+        else:
+            paths.update(path for path in glob.glob(pattern) if os.path.isfile(path))
+    return sorted(paths)
+
+
+# runs in every worker before its first board
+def setTimeLimit( seconds ):
+    Sudoku_Benchmark.TIME_LIMIT = seconds
+
+
+# the jobs of the boards at paths: (path, None, name) for a board file and
+# (path, number, name) for every board of a corpus
+def boardJobs( paths, name ):
+    jobs = []
+    for path in paths:
+        if isCorpus( path ):
+            jobs.extend((path, number, name) for number in xrange(len(openCorpus( path ))))
+        else:
+            jobs.append((path, None, name))
+    return jobs
+
+
+# solves one board in a worker, returns (board, solved, checks, seconds) where board is the
+# path of the board, followed by #number for a board of a corpus
+def solvePath( job ):
+    path, number, name = job
+    if number is None:
+        result, checks, elapsed = Sudoku_Benchmark.runBoard( name, path )
+        return path, result, checks, elapsed
+    result, checks, elapsed = Sudoku_Benchmark.runBoard( name, path, openCorpus( path ).sudoku( number ) )
+    return '%s#%d' % (path, number), result, checks, elapsed
+
+
+# solves the boards with the named algorithm on the given number of processes and prints the results
+def batch( paths, name, workers, timeLimit ):
+    jobs = boardJobs( paths, name )
+    start = time()
+    if workers == 1:            # no pool, the boards are solved one after the other in this process
+        setTimeLimit( timeLimit )
+        pool = None
+        results = ( solvePath( job ) for job in jobs )
+    else:
+        pool = multiprocessing.Pool( workers, setTimeLimit, (timeLimit,) )
+        results = pool.imap_unordered( solvePath, jobs, 1 )
+
+    solved, busy = 0, 0.0
+    try:
+        for path, result, checks, elapsed in results:
+            if result: solved += 1
+            busy += elapsed
+            print '%-40s %-8s %10d checks %8.2f seconds' % (path, 'timeout' if result is None else result, checks, elapsed)
+            sys.stdout.flush()
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+
+    wall = time() - start
+    print '%d of %d solved with %s on %d processes' % (solved, len(jobs), name, workers)
+    print '%.2f seconds of solving in %.2f seconds, %.1f boards per second' % (busy, wall, len(jobs) / wall if wall else 0)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser( description='Solve many boards in parallel.' )
+    parser.add_argument( 'patterns', nargs='+', help='directories or glob patterns of .sudoku files, or corpora' )
+    parser.add_argument( '-a', '--algorithm', default='MCV', choices=sorted(Sudoku_Benchmark.ALGORITHMS) )
+    parser.add_argument( '-j', '--workers', type=int, default=multiprocessing.cpu_count(), help='worker processes' )
+    parser.add_argument( '-t', '--time-limit', type=int, default=Sudoku_Benchmark.TIME_LIMIT, help='seconds per board' )
+    args = parser.parse_args()
+
+    paths = puzzlePaths( args.patterns )
+    if not paths:
+        print 'No boards found'
+        sys.exit(2)
+    batch( paths, args.algorithm, max(1, args.workers), args.time_limit )
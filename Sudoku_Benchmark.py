@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+# Runs the solvers of Sudoku_Complete over the ExtraExamples boards and prints
+# the number of checks and the time each one needed.
+#
+# Usage: python Sudoku_Benchmark.py [algorithm ...]
+# the algorithms are the names in ALGORITHMS, MCV is used if none is given
+import sys, glob, signal
+from time import time
+import Sudoku_Complete
+import Sudoku_Rules
+import Sudoku_Cache
+
+ALGORITHMS = {
+    'backtracking': Sudoku_Complete.backtracking,
+    'dancingLinks': Sudoku_Complete.dancingLinks,
+    'satSolve': Sudoku_Complete.satSolve,
+    'forwardChecking': Sudoku_Complete.forwardChecking,
+    'MCV': Sudoku_Complete.MCV,
+    'MCV_LCV': Sudoku_Complete.MCV_LCV,
+    'MCV_Most_Const_Var': Sudoku_Complete.MCV_Most_Const_Var,
+    'MCV_Singles': Sudoku_Complete.MCV_Singles,
+    'MCV_LCV_Singles': Sudoku_Complete.MCV_LCV_Singles,
+    'MCV_Rules': Sudoku_Complete.MCV_Rules,
+    'MCV_LCV_Rules': Sudoku_Complete.MCV_LCV_Rules,
+    'MCV_CBJ': Sudoku_Complete.MCV_CBJ,
+    'MCV_CBJ_Nogoods': Sudoku_Complete.MCV_CBJ_Nogoods,
+    'MCV_DomWdeg': Sudoku_Complete.MCV_DomWdeg,
+    'MCV_DomWdeg_Geometric': lambda sudoku, poss: Sudoku_Complete.MCV_DomWdeg( sudoku, poss, schedule='geometric' ),
+    'backtracking_Cached': Sudoku_Complete.backtracking_Cached,
+    'MCV_Cached': Sudoku_Complete.MCV_Cached,
+}
+
+# the algorithms that work on the board alone, the others also get the possibility matrix
+BOARD_ONLY = [ 'backtracking', 'dancingLinks', 'satSolve', 'backtracking_Cached' ]
+
+SIZES = [ '16', '25' ]
+TIME_LIMIT = 60     # seconds given to every board before it counts as unsolved
+
+
+class TimeLimitExceeded(Exception):
+    pass
+
+
+def timeLimitExceeded( signum, frame ):
+    raise TimeLimitExceeded()
+
+
+# the example boards of a size, in the order of their number
+def examplePaths( size ):
+    paths = glob.glob('ExtraExamples/%sx%s/*.sudoku*' % (size,size))
+    return sorted(paths, key=lambda path: int(path.split('.')[1]))
+
+
+# solves one board with the named algorithm, returns (solved, checks, seconds)
+# the board read from path is solved in place when it is given
+def runBoard( name, path, sudoku=None ):
+    if sudoku is None: sudoku = Sudoku_Complete.init_board( path )
+    signal.signal(signal.SIGALRM, timeLimitExceeded)
+    signal.alarm(TIME_LIMIT)
+    Sudoku_Complete.start_time = start = time()
+    try:
+        if name in BOARD_ONLY:
+            result = ALGORITHMS[name]( sudoku )
+        else:
+            poss = Sudoku_Complete.initialPoss( sudoku )
+            result = ALGORITHMS[name]( sudoku, poss )
+    except TimeLimitExceeded:
+        result = None
+    finally:
+        signal.alarm(0)
+    return result, sudoku.numChecks, time() - start
+
+
+def benchmark( names ):
+    for name in names:
+        print '-------- %s --------' % name
+        for size in SIZES:
+            solved, total = 0, 0.0
+            for path in examplePaths( size ):
+                result, checks, elapsed = runBoard( name, path )
+                if result: solved += 1
+                total += elapsed
+                print '%-40s %-8s %10d checks %8.2f seconds' % (path, 'timeout' if result is None else result, checks, elapsed)
+            print '%sx%s: %d solved, %.2f seconds in total \n' % (size, size, solved, total)
+            if name.endswith('_Cached'):
+                print 'Solution cache: %(hits)d hits, %(misses)d misses, %(evictions)d evictions, %(entries)d entries, %(bytes)d bytes \n' % \
+                      Sudoku_Cache.solutionCache.stats()
+            if any(stats[0] for stats in Sudoku_Rules.ruleStats.values()):
+                Sudoku_Rules.printRuleStats()
+                Sudoku_Rules.resetRuleStats()
+                print
+
+
+if __name__ == '__main__':
+    names = sys.argv[1:] or [ 'MCV' ]
+    for name in names:
+        if name not in ALGORITHMS:
+            print 'Unknown algorithm: %s (choose from %s)' % (name, ', '.join(sorted(ALGORITHMS)))
+            sys.exit(2)
+    benchmark( names )
@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+from array import array
+from Sudoku_Domains import valueBit
+from Sudoku_Peers import getPeers
+
+# this will be the game object your player will manipulate
+#
+# The cells are kept in one flat array of BoardSize*BoardSize small ints
+# (cell (row,col) sits at row*BoardSize + col) and __slots__ keeps the object
+# itself small, so placing and clearing values during a search allocates nothing.
+class SudokuBoard(object):
+
+    __slots__ = ( 'BoardSize', 'cells', 'numChecks', 'boxOf', 'rowUsed', 'colUsed', 'boxUsed' )
+
+    # the constructor for the SudokuBoard, board is a 2d array [row][col] of values
+    def __init__( self, size, board, numChecks ):
+        self.BoardSize = size #the size of the board
+        self.cells = array( 'B' if size < 256 else 'H', [ value for row in board for value in row ] ) #the current state of the game board
+        self.numChecks = numChecks
+
+        # bitmasks of the values already used in every row, column and box
+        self.boxOf = getPeers(size).boxOf
+        self.rowUsed = [ 0 for i in range(size) ]
+        self.colUsed = [ 0 for i in range(size) ]
+        self.boxUsed = [ 0 for i in range(size) ]
+        for row in range(size):
+            for col in range(size):
+                if board[row][col] != 0: self._use( row, col, valueBit(board[row][col]) )
+
+    # the position of cell (row,col) in the flat cell array
+    def index( self, row, col ):
+        return row*self.BoardSize + col
+
+    # the (row,col) of a position in the flat cell array
+    def position( self, index ):
+        return divmod( index, self.BoardSize )
+
+    def get_value( self, row, col ):
+        return self.cells[row*self.BoardSize + col]
+
+    # This function will place the input value on the board in place, row and col are
+    # both zero-indexed and a value of 0 clears the cell.
+    # The used values of the row, column and box are kept up to date, which stays exact
+    # as long as a value is only placed where is_consistent allows it
+    def set_value( self, row, col, value ):
+        index = row*self.BoardSize + col
+        old = self.cells[index]
+        if old != 0: self._free( row, col, valueBit(old) )
+        if value != 0: self._use( row, col, valueBit(value) )
+        self.cells[index] = value #add the value to the appropriate position on the board
+
+    # checks if value can be placed at (row,col) without clashing with its row, column or box
+    def is_consistent( self, row, col, value ):
+        used = self.rowUsed[row] | self.colUsed[col] | self.boxUsed[self.boxOf[row][col]]
+        return not used & valueBit(value)
+
+    # the values used in a row, column or box, numbered as the first units of PeerTable.units
+    def unit_used( self, unit ):
+        size = self.BoardSize
+        if unit < size: return self.rowUsed[unit]
+        if unit < 2*size: return self.colUsed[unit-size]
+        return self.boxUsed[unit-2*size]
+
+    def _use( self, row, col, bit ):
+        self.rowUsed[row] |= bit
+        self.colUsed[col] |= bit
+        self.boxUsed[self.boxOf[row][col]] |= bit
+
+    def _free( self, row, col, bit ):
+        self.rowUsed[row] &= ~bit
+        self.colUsed[col] &= ~bit
+        self.boxUsed[self.boxOf[row][col]] &= ~bit
+
+    # a 2d array [row][col] copy of the board, for code that wants the old layout
+    @property
+    def CurrentGameboard( self ):
+        size = self.BoardSize
+        return [ self.cells[row*size:(row+1)*size].tolist() for row in range(size) ]
+
+    def __repr__(self):
+        """ returns a string representation for a SudokuBoard """
+        s = dashes = "".join([ ' -' for i in range(self.BoardSize) ])
+        for row in range( self.BoardSize ):
+            sRow = '|'
+            for col in range( self.BoardSize ):
+                sRow += str(self.cells[row*self.BoardSize + col]) + '|'
+            s += '\n' + sRow + '\n' + dashes
+        return s
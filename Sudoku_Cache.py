@@ -0,0 +1,178 @@
+#!/usr/bin/env python
+# A cache of solutions in front of the solvers, shared by boards that are the same up to symmetry:
+# relabeling the values, swapping rows inside a band, bands, columns inside a stack, stacks, and
+# transposing.
+#
+# Every board is brought to a canonical form first. Rows are put in an order that doesn't depend
+# on the symmetries: bands sorted by the clue counts of their rows and boxes, the rows of a band
+# by their clue counts (and the counts of their columns and values), and the same for stacks and
+# columns. Rows and bands that can't be told apart that way are tried in every order (up to
+# ORDER_LIMIT row orders, each with up to ORDER_LIMIT column orders), for the board and its
+# transpose, with the values numbered in the order they are met, and the smallest grid that comes
+# out is the canonical form. The transform that gives it is kept, so the canonical
+# solution found in the cache is turned back into a solution of the board by its inverse.
+# A board whose orders run past the limit may miss a board of its class, but a solution that is
+# found is always right: the key is the whole transformed board.
+#
+# The cache is a bounded LRU: the least recently used solutions go when there are more than
+# maxEntries or they take more than maxBytes.
+import itertools, math
+from array import array
+from collections import OrderedDict
+
+ORDER_LIMIT = 64           # most row orders and most column orders tried for a board and for its transpose
+
+
+# the orders of items (a list of indexes, already sorted by key) that keep the items sorted,
+# items with the same key are taken in every order
+def tiedOrders( items, key ):
+    groups = [ list(group) for value, group in itertools.groupby(items, key) ]
+    for orders in itertools.product(*[ itertools.permutations(group) for group in groups ]):
+        yield [ item for order in orders for item in order ]
+
+
+# the row orders of a grid that respect bands: bands by the clue counts of their rows and boxes,
+# rows inside a band by their clue count, how their clues spread over the stacks, the clue counts
+# of the columns of their clues and how often the values of their clues are used in the grid
+def rowOrders( grid, sub ):
+    colCount = [ sum(1 for value in column if value) for column in zip(*grid) ]
+    valueCount = {}
+    for row in grid:
+        for value in row:
+            if value: valueCount[value] = valueCount.get(value, 0) + 1
+    rowKey = [ ( sum(1 for value in row if value),
+                 tuple(sorted( sum(1 for value in row[stack*sub:(stack+1)*sub] if value) for stack in range(sub) )),
+                 tuple(sorted( colCount[col] for col, value in enumerate(row) if value )),
+                 tuple(sorted( valueCount[value] for value in row if value )) )
+               for row in grid ]
+    bandKey = dict( ( band, ( tuple(sorted( rowKey[row] for row in range(band*sub, (band+1)*sub) )),
+                              tuple(sorted( sum(1 for row in range(band*sub, (band+1)*sub)
+                                                  for value in grid[row][stack*sub:(stack+1)*sub] if value)
+                                            for stack in range(sub) )) ) )
+                    for band in range(sub) )
+    bands = sorted(range(sub), key=lambda band: bandKey[band])
+    for bandOrder in tiedOrders( bands, lambda band: bandKey[band] ):
+        rows = [ sorted(range(band*sub, (band+1)*sub), key=lambda row: rowKey[row]) for band in bandOrder ]
+        for order in itertools.product(*[ list(tiedOrders( band, lambda row: rowKey[row] )) for band in rows ]):
+            yield [ row for band in order for row in band ]
+
+
+# Returns (key, transform) for a board (a 2d array [row][col]): key is a string of the canonical
+# grid and transform (transposed, rows, cols, labels) makes it, the canonical grid holds
+# labels[value] at (i, j) for the value at (rows[i], cols[j]) of the board (or of its transpose)
+def canonicalForm( board ):
+    size = len(board)
+    sub = int(round(math.sqrt(size)))
+    best, transform = None, None
+    for transposed in ( False, True ):
+        grid = [ list(column) for column in zip(*board) ] if transposed else board
+        colOrders = list(itertools.islice(rowOrders( [ list(column) for column in zip(*grid) ], sub ), ORDER_LIMIT))
+        for rows in itertools.islice(rowOrders( grid, sub ), ORDER_LIMIT):
+            for cols in colOrders:
+                labels = {}
+                cells = []
+                smaller = best is None
+                for row in rows:
+                    line = grid[row]
+                    for col in cols:
+                        value = line[col]
+                        if value and value not in labels: labels[value] = len(labels) + 1
+                        cells.append(labels[value] if value else 0)
+                    if not smaller:     # the rows so far equal those of best, compare the new one
+                        last, bestLast = cells[-size:], best[len(cells)-size:len(cells)]
+                        if last > bestLast: break
+                        if last < bestLast: smaller = True
+                else:
+                    if smaller: best, transform = cells, ( transposed, rows, cols, labels )
+
+    # the values missing from the clues get the labels left, in increasing order
+    labels = transform[3]
+    for value in range(1, size+1):
+        if value not in labels: labels[value] = len(labels) + 1
+    return array( 'B' if size < 256 else 'H', best ).tostring(), transform
+
+
+# the board (a 2d array [row][col]) whose canonical form under transform is the flat grid canonical
+def fromCanonical( canonical, transform ):
+    transposed, rows, cols, labels = transform
+    size = len(rows)
+    values = dict( (label, value) for value, label in labels.items() )
+    board = [ [ 0 for col in range(size) ] for row in range(size) ]
+    for i, row in enumerate(rows):
+        for j, col in enumerate(cols):
+            board[row][col] = values[canonical[i*size + j]]
+    return [ list(column) for column in zip(*board) ] if transposed else board
+
+
+class SolutionCache:
+
+    def __init__( self, maxEntries=10000, maxBytes=16 << 20 ):
+        self.maxEntries = maxEntries
+        self.maxBytes = maxBytes
+        self.solutions = OrderedDict()      # canonical board -> canonical solution, oldest first
+        self.bytes = 0
+        self.hits = self.misses = self.evictions = 0
+        self._last = None                   # (board, key, transform) of the last board looked up
+
+    # the key and transform of a board, the last board looked up is not canonicalized again
+    def _canonical( self, board ):
+        board = [ list(row) for row in board ]
+        if self._last is None or self._last[0] != board:
+            self._last = ( board, ) + canonicalForm( board )
+        return self._last[1], self._last[2]
+
+    # the solution of board (a 2d array [row][col]) if the cache holds one for its class, else None
+    def lookup( self, board ):
+        key, transform = self._canonical( board )
+        solution = self.solutions.pop(key, None)
+        if solution is None:
+            self.misses += 1
+            return None
+        self.solutions[key] = solution      # now the most recently used
+        self.hits += 1
+        return fromCanonical( array( 'B' if len(board) < 256 else 'H', solution ), transform )
+
+    # keeps the solution of board
+    def store( self, board, solution ):
+        key, transform = self._canonical( board )
+        transposed, rows, cols, labels = transform
+        grid = [ list(column) for column in zip(*solution) ] if transposed else solution
+        canonical = array( 'B' if len(board) < 256 else 'H', [ labels[grid[row][col]] for row in rows for col in cols ] ).tostring()
+        if key in self.solutions: self.bytes -= len(key) + len(self.solutions.pop(key))
+        self.solutions[key] = canonical
+        self.bytes += len(key) + len(canonical)
+        while self.solutions and ( len(self.solutions) > self.maxEntries or self.bytes > self.maxBytes ):
+            oldKey, oldSolution = self.solutions.popitem(last=False)
+            self.bytes -= len(oldKey) + len(oldSolution)
+            self.evictions += 1
+
+    def clear( self ):
+        self.solutions.clear()
+        self.bytes = 0
+        self._last = None
+
+    def stats( self ):
+        return { 'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                 'entries': len(self.solutions), 'bytes': self.bytes }
+
+
+# the cache the cached solvers share
+solutionCache = SolutionCache()
+
+# Wraps a solver of Sudoku_Complete (called with the SudokuBoard first) so that it looks the board
+# up in the cache first. On a hit the board is filled in without a check and True is returned,
+# otherwise the solver runs and a board it solves is stored.
+def cachedSolver( solver, cache=solutionCache ):
+    def solve( sudoku, *args, **kwargs ):
+        board = sudoku.CurrentGameboard
+        solution = cache.lookup( board )
+        if solution is not None:
+            for row in range(sudoku.BoardSize):
+                for col in range(sudoku.BoardSize):
+                    if board[row][col] == 0: sudoku.set_value( row, col, solution[row][col] )
+            return True
+        result = solver( sudoku, *args, **kwargs )
+        if result: cache.store( board, sudoku.CurrentGameboard )
+        return result
+    solve.__name__ = solver.__name__ + '_Cached'
+    return solve
@@ -1,57 +1,28 @@
 #!/usr/bin/env python
-import struct, string, math, copy
+import random
 from time import time
+from Sudoku_Domains import valueBit, fullMask, popcount, maskValues, lowestValue, PossMatrix
+from Sudoku_Peers import getPeers
+from Sudoku_Board import SudokuBoard
+import Sudoku_Rules
+from Sudoku_DLX import dancingLinks
+from Sudoku_SAT import satSolve, satStats, luby
+from Sudoku_Nogoods import NogoodStore
+from Sudoku_Reader import readPuzzles
+from Sudoku_Cache import cachedSolver
 
-# this will be the game object your player will manipulate
-class SudokuBoard:
-
-    # the constructor for the SudokuBoard
-    def __init__( self, size, board, numChecks ):
-      self.BoardSize = size #the size of the board
-      self.CurrentGameboard= board #the current state of the game board
-      self.numChecks = numChecks
-
-    # This function will create a new sudoku board object
-    # with the input value placed on the GameBoard row and col are
-    # both zero-indexed
-    def set_value( self, row, col, value ):
-        self.CurrentGameboard[row][col]=value #add the value to the appropriate position on the board
-        return SudokuBoard( self.BoardSize, self.CurrentGameboard, self.numChecks ) #return a new board of the same size with the value added
-
-    def __repr__(self):
-        """ returns a string representation for a SudokuBoard """
-        s = dashes = "".join([ ' -' for i in range(self.BoardSize) ])
-        for row in range( self.BoardSize ):
-            sRow = '|'
-            for col in range( self.BoardSize ):
-                sRow += str(self.CurrentGameboard[row][col]) + '|'
-            s += '\n' + sRow + '\n' + dashes
-        return s
-
-    
 # parse_file
 # this function will parse a sudoku text file (like those posted on the website)
 # into a BoardSize, and a 2d array [row,col] which holds the value of each cell.
 # array elements with a value of 0 are considered to be empty
+# (the first board of the file, Sudoku_Reader.readPuzzles streams all of them)
 
 def parse_file(filename):
-    f = open(filename, 'r')
-    BoardSize = int( f.readline())
-    NumVals = int(f.readline())
-
-    # initialize a blank board
-    board= [ [ 0 for i in range(BoardSize) ] for j in range(BoardSize) ]
-
-    # populate the board with initial values
-    for i in range(NumVals):
-        line = f.readline()
-        chars = line.split()
-        row = int(chars[0])
-        col = int(chars[1])
-        val = int(chars[2])
-        board[row-1][col-1]=val
-    
-    return board
+    boards = readPuzzles( filename, 'sudoku' )
+    try:
+        return next(boards)
+    finally:
+        boards.close()     # closes the file
 
 
 # creates a SudokuBoard object initialized with values from a text file like those found on the course website
@@ -60,52 +31,16 @@ def init_board( file_name ):
     return SudokuBoard( len(board), board, 0 )
 
 
-# checks if a test value will be consistent with the board
-def isConsistent( BoardArray, testCellRow, testCellCol, testCellVal ):
-        size = len(BoardArray)
-        subsquare = int(math.sqrt(size))
-
-        # check if any other cell in the row, column, or grid of the test cell has the test value
-        for i in range(size):
-            if ( (BoardArray[testCellRow][i] == testCellVal) or (BoardArray[i][testCellCol] == testCellVal) ):
-                return False
-            
-            # determine which square the cell is in
-            SquareRow = testCellRow // subsquare
-            SquareCol = testCellCol // subsquare
-            for i in range(subsquare):
-                for j in range(subsquare):
-                    if( BoardArray[SquareRow*subsquare + i][SquareCol*subsquare + j] == testCellVal ):
-                        return False
-        return True
 """ -------------------------------- Backtracking ---------------------------------"""
 
 def getUnassignedVar( sudoku ):
-    for row in range(sudoku.BoardSize):
-        for col in range(sudoku.BoardSize):
-            if ( sudoku.CurrentGameboard[row][col] == 0 ): return row, col
+    if ( 0 in sudoku.cells ): return sudoku.position( sudoku.cells.index(0) )   # first blank in row major order
     return -1, -1
 
 
 def backtracking( sudoku ):
-    # stop when time is maxed out
-    global start_time
-    if ( time() - start_time ) > 600:
-        print 'Time Limit Exceeded \n'
-        return False
-        
-    # get an unassigned cell
-    row, col = getUnassignedVar( sudoku )
-    if ( row == col == -1 ): return True
-    
-    # try different values for a cell
-    for value in range( 1, sudoku.BoardSize+1 ):
-        sudoku.numChecks += 1
-        if isConsistent( sudoku.CurrentGameboard, row, col, value ):
-            sudoku.set_value( row, col, value )
-            if ( backtracking( sudoku ) ): return True
-        sudoku.set_value( row, col, 0 )
-    return False
+    # the first blank in row major order gets every value in turn, checked against the board only
+    return iterativeSearch( sudoku, None, firstBlank, ascendingValues, 600 )
 
 
 """ -------------------------------- Forward Checking ---------------------------------"""
@@ -113,188 +48,528 @@ def backtracking( sudoku ):
 # prints a matrix for possible values for every cell 
 def printPoss(matrix):
     print " ---------  Possibility Matrix --------------- "
-    for row in matrix: print row
+    for row in matrix: print [ maskValues(mask) for mask in row ]
     print " ---------------------------------------------\n " 
 
 
-# sets the intial possibility matrix 
+# sets the intial possibility matrix, every cell holds a bitmask of its possible values:
+# the values not used yet in its row, column and box, read off the used value masks the board
+# keeps, so the setup is one pass over the cells instead of an updatePoss for every clue.
+# A clue keeps its own value.
 def initialPoss( sudoku ):
-    poss = [[range(1,sudoku.BoardSize+1) for row in range(sudoku.BoardSize)] for col in range(sudoku.BoardSize)]
-    for row in range(sudoku.BoardSize):
-        for col in range(sudoku.BoardSize):
-            value = sudoku.CurrentGameboard[row][col]
-            if (value != 0): # check for cells already assigned
- #               poss[row][col] = [] # no possibilities for cells already assigned
-                poss = updatePoss ( sudoku, poss, row, col, value, 'removePoss' ) # update cells in same row, column, and grid
+    size = sudoku.BoardSize
+    full, cells, boxOf = fullMask(size), sudoku.cells, getPeers(size).boxOf
+    rowUsed, colUsed, boxUsed = sudoku.rowUsed, sudoku.colUsed, sudoku.boxUsed
+    rows = []
+    for row in range(size):
+        used, boxes, first = rowUsed[row], boxOf[row], row*size
+        rows.append([ full & ~( used | colUsed[col] | boxUsed[boxes[col]] ) | ( valueBit(cells[first+col]) if cells[first+col] else 0 )
+                      for col in range(size) ])
+    poss = PossMatrix(rows)
+    poss.queueBlanks( cells )
     return poss
 
 
-# adds/removes value from the possibility matrix if it in the same row, column, or grid as the curretn cell
+# removes value from the possibility matrix if it in the same row, column, or grid as the curretn cell,
+# every removal is pushed on the trail so undoPoss can give it back
 def updatePoss( sudoku, poss, currentRow, currentCol, value, action ):
-    size = len(poss)
-    # remove value if in the same row or column as the curretn cell
-    for i in range(size):
-        if action == 'removePoss':
-            if ( value in poss[currentRow][i] ): poss[currentRow][i].remove(value)
-            if ( value in poss[i][currentCol] ): poss[i][currentCol].remove(value)
-        elif action == 'addPoss':
-            if ( isConsistent(sudoku.CurrentGameboard, currentRow, i, value) \
-                 and (value not in poss[currentRow][i]) ):
-                poss[currentRow][i].append(value)
-            if ( isConsistent(sudoku.CurrentGameboard, i, currentCol, value) \
-                 and (value not in poss[i][currentCol]) ):
-                poss[i][currentCol].append(value)
-            
-    # determine which square the cell is in
-    subsquare = int(math.sqrt(size))
-    SquareRow = currentRow // subsquare
-    SquareCol = currentCol // subsquare
-
-    # remove value if in the same grid as the current cell
-    for i in range( subsquare ):
-        for j in range( subsquare ):
-            row, col = SquareRow*subsquare + i, SquareCol*subsquare + j
-            if( value in poss[row][col] and action == 'removePoss' ):
-                poss[row][col].remove(value)
-            elif ( action == 'addPoss' and (value not in poss[row][col]) and \
-                   isConsistent( sudoku.CurrentGameboard, row, col, value ) ): 
-                poss[row][col].append(value)
+    bit = valueBit(value)
+    trail, support, sizes, buckets = poss.trail, poss.support, poss.sizes, poss.buckets
+    n = sudoku.BoardSize
+    table = getPeers(n)
+    if action == 'removePoss':
+        poss.take( currentRow, currentCol )
+        for row, col in table.peers[currentRow][currentCol]:
+            if poss[row][col] & bit:
+                poss[row][col] &= ~bit
+                trail.append((row, col, value))
+                size = sizes[row][col]
+                sizes[row][col] = size - 1
+                cell = 1 << (row*n + col)
+                if buckets[size] & cell:            # blanks move down one bucket
+                    buckets[size] ^= cell
+                    buckets[size-1] |= cell
+                    for unit in table.unitsOf[row][col]: support[unit][value] -= 1
     return poss
 
-#-------------------------------------------
 
-def forwardChecking( sudoku, poss ):
-    # stop when time is maxed out
-    global start_time
-    if ( time() - start_time ) > 120:
-        print 'Time Limit Exceeded \n'
-        return False
-        
-    # get an unassigned cell
-    row, col = getUnassignedVar( sudoku )
+# gives back every possibility removed since the trail had length mark,
+# when the board is given the blanks assigned since then are cleared again
+def undoPoss( poss, mark, sudoku=None ):
+    trail, support, sizes, buckets = poss.trail, poss.support, poss.sizes, poss.buckets
+    n = len(poss)
+    unitsOf = getPeers(n).unitsOf
+    while len(trail) > mark:
+        row, col, value = trail.pop()
+        if value == 0:
+            poss.release( row, col )
+            if sudoku is not None: sudoku.set_value( row, col, 0 )
+            continue
+        poss[row][col] |= valueBit(value)
+        size = sizes[row][col]
+        sizes[row][col] = size + 1
+        cell = 1 << (row*n + col)
+        if buckets[size] & cell:
+            buckets[size] ^= cell
+            buckets[size+1] |= cell
+            for unit in unitsOf[row][col]: support[unit][value] += 1
+    return poss
+
+#------------------ SINGLES PROPAGATION -----------------------------#
+
+# how much propagation MCV and MCV_LCV run after every assignment
+NO_PROPAGATION = 0      # plain forward checking
+NAKED_SINGLES = 1       # a blank with a single value left gets it
+HIDDEN_SINGLES = 2      # and so does the only blank of a row, column or box that can hold a value
+ADVANCED_RULES = 3      # and the rules of Sudoku_Rules run on the units that changed
+
+# places a value that propagation found to be forced, it goes on the trail like any other assignment
+def assignForced( sudoku, poss, row, col, value ):
+    if not sudoku.is_consistent( row, col, value ): return False
+    sudoku.set_value( row, col, value )
+    sudoku.numChecks += 1
+    updatePoss( sudoku, poss, row, col, value, 'removePoss' )
+    return True
+
+
+# looks at value in a row, column or box unit: when one blank is left that can hold it the value
+# is placed there, when none is left and the value is not placed yet the board can't be solved
+def hiddenSingle( sudoku, poss, unit, value ):
+    count = poss.support[unit][value]
+    if count > 1 or sudoku.unit_used( unit ) & valueBit(value): return True
+    if count == 0: return False
+    size = sudoku.BoardSize
+    for row, col in getPeers(size).units[unit]:
+        if sudoku.cells[row*size + col] == 0 and poss[row][col] & valueBit(value):
+            return assignForced( sudoku, poss, row, col, value )
+    return True
+
+
+# Runs naked singles (and hidden singles from level HIDDEN_SINGLES on) until nothing is forced any more.
+# Only what changed since the trail had length mark is looked at: a pruned value can leave its blank
+# with one value, or leave one place for the value in the blank's row, column and box; an assigned
+# blank leaves its other values one place fewer in its units. Every forced assignment goes through
+# updatePoss, so it adds its own entries to the trail and undoPoss( poss, mark, sudoku ) takes it back.
+# With mark None the whole board is looked at first, which is what the root of a search wants.
+# Returns False as soon as a blank or a unit runs out of places.
+def propagateSingles( sudoku, poss, mark, level ):
+    if level == NO_PROPAGATION: return True
+    size = sudoku.BoardSize
+    table = getPeers(size)
+    trail, cells, sizes = poss.trail, sudoku.cells, poss.sizes
+    hidden = level >= HIDDEN_SINGLES
+
+    if mark is None:
+        mark = len(trail)
+        for row in range(size):
+            for col in range(size):
+                if cells[row*size + col] == 0:
+                    if sizes[row][col] == 0: return False
+                    if sizes[row][col] == 1 and not assignForced( sudoku, poss, row, col, lowestValue(poss[row][col]) ):
+                        return False
+        if hidden:
+            for unit in range(3*size):
+                for value in range(1, size+1):
+                    if not hiddenSingle( sudoku, poss, unit, value ): return False
+
+    while mark < len(trail):
+        row, col, value = trail[mark]
+        mark += 1
+        if value == 0:      # an assigned blank, its other values lost a place in its units
+            if hidden:
+                assigned = sudoku.get_value( row, col )
+                for unit in table.unitsOf[row][col][:3]:
+                    for other in maskValues(poss[row][col]):
+                        if other != assigned and not hiddenSingle( sudoku, poss, unit, other ): return False
+            continue
+        if cells[row*size + col] == 0:
+            left = sizes[row][col]
+            if left == 0: return False
+            if left == 1 and not assignForced( sudoku, poss, row, col, lowestValue(poss[row][col]) ): return False
+        if hidden:
+            for unit in table.unitsOf[row][col][:3]:
+                if not hiddenSingle( sudoku, poss, unit, value ): return False
+    return True
+
+
+
+# Runs the propagation of a level: singles to fixpoint, then from ADVANCED_RULES on the rules of
+# Sudoku_Rules (those switched on for the board size, cheapest first) on the units touched since the
+# trail had length mark, going back to singles after every rule that removes something.
+# A unit stays due for the rules until a pass over all of them finds nothing.
+def propagate( sudoku, poss, mark, level ):
+    trail = poss.trail
+    seen = len(trail) if mark is None else mark
+    if not propagateSingles( sudoku, poss, mark, level ): return False
+    if level < ADVANCED_RULES: return True
+    size = sudoku.BoardSize
+    unitsOf = getPeers(size).unitsOf
+    rules = Sudoku_Rules.rulesFor( size )
+    units = set(range(3*size)) if mark is None else set()
+    while True:
+        for row, col, value in trail[seen:]: units.update(unitsOf[row][col][:3])
+        seen = len(trail)
+        if not units: return True
+        if not Sudoku_Rules.applyRules( sudoku, poss, sorted(units), rules ): return True
+        if not propagateSingles( sudoku, poss, seen, level ): return False
+
+#------------------ ITERATIVE SEARCH -----------------------------#
+
+TIME_CHECK_INTERVAL = 1024      # assignments between two looks at the clock
+
+# When the time limits of the searches started counting. Callers that want their own setup counted
+# too (the command line, Sudoku_Benchmark) set it before they call a solver, otherwise every
+# search starts its clock when it is called.
+start_time = None
+
+# the time the limits of a search called now count from
+def searchStart():
+    return time() if start_time is None else start_time
+
+# the blank to branch on for the searches that go through the board in row major order
+def firstBlank( sudoku, poss ):
+    return getUnassignedVar( sudoku )
+
+
+# the values of a blank in increasing order, all of them when there is no possibility matrix
+def ascendingValues( sudoku, poss, row, col ):
+    if poss is None: return range( 1, sudoku.BoardSize+1 )
+    return maskValues(poss[row][col])
+
+
+# Depth first search without recursion, the solvers below differ only in what they plug in:
+#   selectCell( sudoku, poss ) gives the (row,col) to branch on, (-1,-1) when the board is full
+#   orderValues( sudoku, poss, row, col ) gives the values to try there, in order
+#   propagation is the propagation level run after every assignment (see propagate)
+# Every level of the search has its entry in lists allocated once for as many levels as there are
+# blanks: the cell, its values, how many of them were tried and the trail mark of the one placed.
+# Without a possibility matrix (poss None) values are only checked against the board and every
+# value tried counts as a check, otherwise only the values placed count.
+# The clock is read every TIME_CHECK_INTERVAL assignments, None is returned after timeLimit seconds
+# (False means the whole tree was searched without a solution).
+# At the same moments share( level, rows, cols, choices, tried ) is called when given: it may hand
+# the untried values of a level to someone else by moving tried[level] past them, and it stops
+# the search by returning False.
+def iterativeSearch( sudoku, poss, selectCell, orderValues, timeLimit, propagation=NO_PROPAGATION, share=None ):
+    started = searchStart()
+    levels = sudoku.cells.count(0) + 1
+    rows = [ 0 for i in range(levels) ]
+    cols = [ 0 for i in range(levels) ]
+    choices = [ None for i in range(levels) ]
+    tried = [ 0 for i in range(levels) ]
+    marks = [ None for i in range(levels) ]     # None while no value of the level is on the board
+    setValue, isConsistent = sudoku.set_value, sudoku.is_consistent
+
+    row, col = selectCell( sudoku, poss )
     if ( row == col == -1 ): return True
+    level = 0
+    rows[0], cols[0], choices[0] = row, col, orderValues( sudoku, poss, row, col )
+    checks = assignments = 0
+    # the checks are counted locally and added in the finally, so they are kept when the search is
+    # interrupted from outside (the SIGALRM of Sudoku_Benchmark.runBoard) as well as when it returns
+    try:
+        while level >= 0:
+            row, col = rows[level], cols[level]
+            if marks[level] is not None:        # take back the value tried last on this level
+                if poss is None:
+                    setValue( row, col, 0 )
+                elif propagation:               # the cells it forced are cleared too
+                    undoPoss( poss, marks[level], sudoku )
+                else:
+                    undoPoss( poss, marks[level] )
+                    setValue( row, col, 0 )
+                marks[level] = None
+
+            # the next value of the level that fits the board
+            values, i = choices[level], tried[level]
+            if poss is None:
+                while i < len(values):
+                    checks += 1
+                    if isConsistent( row, col, values[i] ): break
+                    i += 1
+            else:
+                while i < len(values) and not isConsistent( row, col, values[i] ): i += 1
+            if i == len(values):                # every value failed, go back up
+                level -= 1
+                continue
+            tried[level] = i + 1
+
+            setValue( row, col, values[i] )
+            assignments += 1
+            if assignments % TIME_CHECK_INTERVAL == 0:
+                if ( time() - started ) > timeLimit:
+                    print 'Time Limit Exceeded \n'
+                    return None
+                if share is not None and not share( level, rows, cols, choices, tried ): break
+            if poss is None:
+                marks[level] = 0
+            else:
+                checks += 1
+                marks[level] = len(poss.trail)
+                updatePoss( sudoku, poss, row, col, values[i], 'removePoss' )
+                if propagation and not propagate( sudoku, poss, marks[level], propagation ): continue
+
+            row, col = selectCell( sudoku, poss )
+            if ( row == col == -1 ): return True
+            level += 1
+            rows[level], cols[level], choices[level], tried[level] = row, col, orderValues( sudoku, poss, row, col ), 0
+        return False
+    finally:
+        sudoku.numChecks += checks
 
-    # try different values for a cell
-    possCopy = copy.deepcopy(poss[row][col])
-    for value in possCopy:
-        
-        
-        if isConsistent( sudoku.CurrentGameboard, row, col, value ):
-            sudoku.set_value( row, col, value )
-            sudoku.numChecks += 1
-            updatePoss( sudoku, poss, row, col, value, 'removePoss' )
-            if ( forwardChecking( sudoku, poss ) ): return True
-
-        sudoku.set_value( row, col, 0 )
-        updatePoss( sudoku, poss, row, col, value, 'addPoss' )
-                    
-    return False
+#-------------------------------------------
+
+def forwardChecking( sudoku, poss ):
+    # the first blank in row major order gets the values left in its domain
+    return iterativeSearch( sudoku, poss, firstBlank, ascendingValues, 120 )
 
 #------------------ MCV -----------------------------#
 
+# the blank with the fewest possibilities, ties go to the first in row major order
 def MCV_Row_Col(sudoku, poss):
-    Min_Length = sudoku.BoardSize   # worst case to have Possibilities as long as the Sudoku Board
-    MCVrow = -1                     # This just an intialization for row and col, if there are no zeros (blanks) left it will return True (check the MCV Algorithm)
-    MCVcol = -1
-    for row in range(sudoku.BoardSize):         # Loop through the sudoku board for zeros (blanks)
-        for col in range(sudoku.BoardSize):
-            if ( sudoku.CurrentGameboard[row][col] == 0 ):  # if a zero (blank) is found
-                if (len(poss[row][col])<Min_Length):        # if the length of possibilities is less than the Min_Length we found so far    
-                    Min_Length = len(poss[row][col])        # Then assign this value to Min_Length
-                    MCVrow = row                            # Row of MCV
-                    MCVcol = col                            # Col of MCV
-    return MCVrow, MCVcol
-
-
-def MCV (sudoku, poss):
-    # stop when time is maxed out
-    global start_time
-    if ( time() - start_time ) > 1000000000:
-        print 'Time Limit Exceeded \n'
-        return False
-        
-    # Get the Most Constraint Variable
-    row, col = MCV_Row_Col( sudoku,poss )
-    if ( row == col == -1 ): return True
+    return poss.mostConstrained()           # (-1,-1) when no blanks are left, see the MCV algorithm
 
-    # Try the Values of the MCV
-    possCopy = copy.deepcopy(poss[row][col])
-    for value in possCopy:
-        
-        
-        if isConsistent( sudoku.CurrentGameboard, row, col, value ):    # If the assignment is consistent
-            sudoku.set_value( row, col, value )
-            sudoku.numChecks += 1
-            updatePoss( sudoku, poss, row, col, value, 'removePoss' )
-            if ( MCV( sudoku, poss ) ): return True             # Recursivly Assign values to the next MCV
-
-        sudoku.set_value( row, col, 0 )
-        updatePoss( sudoku, poss, row, col, value, 'addPoss' )
-                    
-    return False
+
+def MCV (sudoku, poss, propagation=NO_PROPAGATION):
+    # the Most Constraint Variable gets the values left in its domain
+    return iterativeSearch( sudoku, poss, MCV_Row_Col, ascendingValues, 1000000000, propagation )
 
 #------------------ MCV + LCV -----------------------------#
 
+# counts for every possible value of (row,col) how many possibilities it would remove from the peers of the cell.
+# The peers are the union of the row, column and box, so the row and column segments inside the box are
+# counted twice and the cell itself three times, which the support counts let us take off again
+def peerConstraints ( sudoku, poss, row, col ):
+    constraints = {}
+    support = poss.support
+    rowUnit, colUnit, boxUnit, rowSegment, colSegment = getPeers(sudoku.BoardSize).unitsOf[row][col]
+    for x in maskValues(poss[row][col]):
+        constraints[x] = support[rowUnit][x] + support[colUnit][x] + support[boxUnit][x] \
+                         - support[rowSegment][x] - support[colSegment][x] - 1
+    return constraints
+
+
 def LCV_Val ( sudoku, poss,row,col ):
-    temp_sudoku = copy.deepcopy(sudoku)
-    temp_poss = copy.deepcopy(poss)
-    temp_poss_Copy = copy.deepcopy(temp_poss[row][col])
-    MRV_Row = row
-    MRV_Col = col
-    MRV_Val = []        # this is what we will return, an array of vlaues sorted accodring to how many possibilities will leave 
-    temp_MRV = []
-    Val_poss_sum = []   # the sum of remaining values for each possible value of the MCV
+    constraints = peerConstraints(sudoku,poss,row,col)
+    MRV_Val = sorted(constraints, key=lambda x: (constraints[x], x))     # The values are now sorted, with LCV in index 0
+    return MRV_Val
+
+
+def MCV_LCV (sudoku, poss, propagation=NO_PROPAGATION):
+    # the Most Constraint Variable gets its values sorted with the Least Constraining Value first
+    return iterativeSearch( sudoku, poss, MCV_Row_Col, LCV_Val, 1000000, propagation )
+#------------------ MCV WITH SINGLES PROPAGATION -----------------------------#
+
+# MCV and MCV+LCV with naked and hidden singles run to fixpoint at the root and after every assignment
+def MCV_Singles (sudoku, poss):
+    return propagateSingles( sudoku, poss, None, HIDDEN_SINGLES ) and MCV( sudoku, poss, HIDDEN_SINGLES )
+
+
+def MCV_LCV_Singles (sudoku, poss):
+    return propagateSingles( sudoku, poss, None, HIDDEN_SINGLES ) and MCV_LCV( sudoku, poss, HIDDEN_SINGLES )
 
     
-    MRV_Poss = sudoku.BoardSize**3  # intialzes an artificial worst case for remaining possibilities (if sudoku is completlty blank then all blanks can be filled by Sudoku.BoardSize possibilites) 
-    for x in temp_poss_Copy:
-        poss_sum = 0                # this will sum how many values will remian in the prossibility matrix after using the carrent value of the MCV 
-        updatePoss(temp_sudoku,temp_poss,row,col,x,'removePoss')
-        for i in range(sudoku.BoardSize):       # loop through the possibility array
-            for j in range(sudoku.BoardSize):
-                poss_sum += len(temp_poss[i][j])        # Summation of how many values are remaining in the possibilty matrix for a given value
-                
-        Val_poss_sum.append(poss_sum)   # here we have a matrix of the sum of possibility for each value
-        temp_MRV.append(x)              # these are the values, but they are not sorted according to LCV
-         
-        updatePoss(temp_sudoku,temp_poss,row,col,x,'addPoss')
-
-    sorted_Val_poss_sum = sorted(Val_poss_sum)
-    for y in sorted_Val_poss_sum:
-        MRVindex = Val_poss_sum.index(y)
-        MRV_Val.insert(0,temp_MRV[MRVindex])    # The values are now sorted, with LCV in index 0
-        
-    return MRV_Val
+# the same with the rules of Sudoku_Rules on top of the singles
+def MCV_Rules (sudoku, poss):
+    return propagate( sudoku, poss, None, ADVANCED_RULES ) and MCV( sudoku, poss, ADVANCED_RULES )
 
 
-def MCV_LCV (sudoku, poss):
-    # stop when time is maxed out
-    global start_time
-    if ( time() - start_time ) > 1000000:
-        print 'Time Limit Exceeded \n'
-        return False
-        
-    # Get the Most Constraint Variable
-    row, col= MCV_Row_Col( sudoku,poss )
-    if ( row == col == -1 ): return True
+def MCV_LCV_Rules (sudoku, poss):
+    return propagate( sudoku, poss, None, ADVANCED_RULES ) and MCV_LCV( sudoku, poss, ADVANCED_RULES )
+
     
-    # Try the Values of the MCV
-    possCopy = copy.deepcopy(poss[row][col])
-    possCopy = LCV_Val(sudoku,poss,row,col)     # This will return a sorted possCopy according to remaining variables
-    for value in possCopy:
-        
-        
-        if isConsistent( sudoku.CurrentGameboard, row, col, value ):# If the assignment is consistent
-            sudoku.set_value( row, col, value )
-            sudoku.numChecks += 1
-            updatePoss( sudoku, poss, row, col, value, 'removePoss' )
-            if ( MCV_LCV( sudoku, poss ) ): return True             # Recursivly Assign values to the next MCV
-
-        sudoku.set_value( row, col, 0 )
-        updatePoss( sudoku, poss, row, col, value, 'addPoss' )
-                    
+#------------------ MCV + CONFLICT DIRECTED BACKJUMPING -----------------------------#
+
+NOGOOD_LIMIT = 20000        # nogoods kept by MCV_CBJ_Nogoods
+NOGOOD_MAX_SIZE = 12        # and the most assignments one of them may have
+
+# backjumps counts the failures that jumped over at least one level
+cbjStats = { 'backjumps': 0 }
+
+# MCV with forward checking and conflict directed backjumping.
+# Every blank the search tries gets a conflict set: the assigned cells that took values out of its
+# domain, plus whatever the subtrees below its values blamed. When every value of a blank fails
+# the search goes straight back to the deepest cell of its conflict set instead of the level above,
+# every level in between is given up without trying its other values.
+# With a NogoodStore, the assignments of every failing conflict set are kept as a nogood, and a
+# value that completes a kept nogood is rejected without searching below it.
+# The search keeps its levels on an explicit stack like iterativeSearch, so it is not bounded by
+# the recursion limit, and it gives up (None) after timeLimit seconds.
+def MCV_CBJ (sudoku, poss, nogoods=None, timeLimit=1000000):
+    size = sudoku.BoardSize
+    table = getPeers(size)
+    root = [ row[:] for row in poss ]       # the domains before the search
+    blanks = set( (row,col) for row in range(size) for col in range(size) if sudoku.get_value(row,col) == 0 )
+    started = searchStart()
+
+    # the assigned blanks that took a value out of the domain of (row,col)
+    def culprits( row, col ):
+        return set( (i,j) for i, j in table.peers[row][col]
+                    if (i,j) in blanks and sudoku.get_value(i,j) and root[row][col] & valueBit(sudoku.get_value(i,j)) )
+
+    row, col = MCV_Row_Col( sudoku,poss )
+    if ( row == col == -1 ): return True
+    # every level holds [row, col, values, values tried, conflict set, trail mark of the value placed]
+    stack = [ [ row, col, maskValues(poss[row][col]), 0, culprits( row, col ), None ] ]
+    failure = None          # the conflict set of the subtree that just failed
+    assignments = 0
+    while stack:
+        level = stack[-1]
+        row, col, values, i, conflict, mark = level
+        if mark is not None:                    # the value placed last failed with conflict set failure
+            undoPoss( poss, mark )
+            sudoku.set_value( row, col, 0 )
+            level[5] = None
+            if (row, col) not in failure:       # this cell played no part in the failure, jump over it
+                cbjStats['backjumps'] += 1
+                stack.pop()
+                continue
+            conflict.update(failure)
+            conflict.discard((row, col))
+
+        if i == len(values):                    # every value failed, blame the conflict set
+            if nogoods is not None:
+                nogoods.add( frozenset( (i, j, sudoku.get_value(i,j)) for i, j in conflict ) )
+            failure = conflict
+            stack.pop()
+            continue
+        value = values[i]
+        level[3] = i + 1
+
+        sudoku.set_value( row, col, value )
+        sudoku.numChecks += 1
+        level[5] = len(poss.trail)
+        updatePoss( sudoku, poss, row, col, value, 'removePoss' )
+        assignments += 1
+        if assignments % TIME_CHECK_INTERVAL == 0 and ( time() - started ) > timeLimit:
+            print 'Time Limit Exceeded \n'
+            return None
+        nogood = nogoods.violated( sudoku, row, col, value ) if nogoods is not None else None
+        if nogood is not None:
+            failure = set( (i,j) for i, j, other in nogood )
+            continue
+
+        row, col = MCV_Row_Col( sudoku,poss )
+        if ( row == col == -1 ): return True
+        stack.append([ row, col, maskValues(poss[row][col]), 0, culprits( row, col ), None ])
     return False
 
+
+# MCV_CBJ keeping nogoods
+def MCV_CBJ_Nogoods (sudoku, poss):
+    return MCV_CBJ( sudoku, poss, NogoodStore( NOGOOD_LIMIT, NOGOOD_MAX_SIZE ) )
+
+    
+#------------------ DOM/WDEG WITH RESTARTS -----------------------------#
+
+RESTART_BASE = 100          # failures allowed in the first run
+RESTART_GROWTH = 1.5        # how much each run of the geometric schedule grows
+
+# restarts and failures of the MCV_DomWdeg runs so far
+domWdegStats = { 'restarts': 0, 'failures': 0 }
+
+# the failures allowed in run number i (from 1) of a 'luby' or 'geometric' restart schedule
+def restartLimit( schedule, i ):
+    if schedule == 'luby': return luby(i) * RESTART_BASE
+    return int( RESTART_BASE * RESTART_GROWTH ** (i-1) )
+
+
+# the row, column or box unit (i,j) shares with (row,col)
+def sharedUnit( size, row, col, i, j ):
+    if row == i: return row
+    if col == j: return size + col
+    return 2*size + getPeers(size).boxOf[row][col]
+
+
+# The blank with the smallest domain size / weighted degree. The weighted degree adds up the weight of
+# its row, column and box once for every other blank in them, so with all weights at 1 it is the
+# number of blank peers. Ties are broken at random. (-1,-1) when no blank is left.
+def domWdegRowCol( sudoku, poss, weights, rng ):
+    unitsOf = getPeers(sudoku.BoardSize).unitsOf
+    # weight times the blanks (other than the cell itself) of every row, column and box
+    free = [ weight * (sudoku.BoardSize - 1 - popcount(sudoku.unit_used( unit ))) for unit, weight in enumerate(weights) ]
+    best, ties = None, []
+    for size in range(1, len(poss.buckets)):
+        for row, col in poss.bucketCells(size):
+            rowUnit, colUnit, boxUnit = unitsOf[row][col][:3]
+            score = size / float( free[rowUnit] + free[colUnit] + free[boxUnit] or 1 )
+            if size == 1: score -= 1       # a blank with one value left has nothing to choose, it goes first
+            if best is None or score < best:
+                best, ties = score, [ (row, col) ]
+            elif score == best:
+                ties.append((row, col))
+    if best is None: return -1, -1
+    return rng.choice(sorted(ties))
+
+
+# One run of the dom/wdeg search, giving up (None) once budget[0] failures were spent or after
+# timeLimit seconds from started. A value whose forward checking wipes out a domain adds one to
+# the weight of the unit the assigned cell and the wiped out cell share.
+# The levels are kept on an explicit stack, a run that gives up takes back all its assignments.
+def domWdegSearch( sudoku, poss, weights, rng, budget, timeLimit=1000000, started=None ):
+    if started is None: started = searchStart()
+    row, col = domWdegRowCol( sudoku, poss, weights, rng )
+    if ( row == col == -1 ): return True
+    # every level holds [row, col, values, values tried, trail mark of the value placed]
+    stack = [ [ row, col, maskValues(poss[row][col]), 0, None ] ]
+    assignments = 0
+    while stack:
+        level = stack[-1]
+        row, col, values, i, mark = level
+        if mark is not None:                    # the value placed last failed
+            undoPoss( poss, mark )
+            sudoku.set_value( row, col, 0 )
+            level[4] = None
+            domWdegStats['failures'] += 1
+            budget[0] -= 1
+            if budget[0] <= 0: break
+        if i == len(values):
+            stack.pop()
+            continue
+        value = values[i]
+        level[3] = i + 1
+
+        sudoku.set_value( row, col, value )
+        sudoku.numChecks += 1
+        level[4] = len(poss.trail)
+        updatePoss( sudoku, poss, row, col, value, 'removePoss' )
+        assignments += 1
+        if assignments % TIME_CHECK_INTERVAL == 0 and ( time() - started ) > timeLimit: break
+        if poss.buckets[0]:
+            for i, j in poss.bucketCells(0): weights[sharedUnit( sudoku.BoardSize, row, col, i, j )] += 1
+            continue
+
+        row, col = domWdegRowCol( sudoku, poss, weights, rng )
+        if ( row == col == -1 ): return True
+        stack.append([ row, col, maskValues(poss[row][col]), 0, None ])
+    else:
+        return False
+
+    # out of failures or time, back to the root
+    for row, col, values, i, mark in reversed(stack):
+        if mark is not None:
+            undoPoss( poss, mark )
+            sudoku.set_value( row, col, 0 )
+    return None
+
+
+# Search ordered by dom/wdeg with restarts on a 'luby' or 'geometric' schedule. Every run starts
+# from the root again but keeps the unit weights the earlier runs learnt. The tie breaks come from
+# random.Random(seed), so a seed always gives the same search. None after timeLimit seconds.
+def MCV_DomWdeg (sudoku, poss, seed=0, schedule='luby', timeLimit=1000000):
+    rng = random.Random(seed)
+    started = searchStart()
+    weights = [ 1 for unit in range(3*sudoku.BoardSize) ]
+    run = 1
+    while True:
+        result = domWdegSearch( sudoku, poss, weights, rng, [ restartLimit( schedule, run ) ], timeLimit, started )
+        if result is not None: return result
+        if ( time() - started ) > timeLimit:
+            print 'Time Limit Exceeded \n'
+            return None
+        domWdegStats['restarts'] += 1
+        run += 1
+
     
 #------------------ MCV + MOST CONSTRAINING VALUE ----------------------------#
 ###########################################################################################
@@ -303,157 +578,149 @@ def MCV_LCV (sudoku, poss):
 
 
 def Most_Const_Value ( sudoku, poss,row,col ):
-    temp_sudoku = copy.deepcopy(sudoku)
-    temp_poss = copy.deepcopy(poss)
-    temp_poss_Copy = copy.deepcopy(temp_poss[row][col])
-    MRV_Row = row
-    MRV_Col = col
-    MRV_Val = []        # this is what we will return, an array of vlaues sorted accodring to how many possibilities will leave 
-    temp_MRV = []
-    Val_poss_sum = []   # the sum of remaining values for each possible value of the MCV
-
-    
-    MRV_Poss = sudoku.BoardSize**3  # intialzes an artificial worst case for remaining possibilities (if sudoku is completlty blank then all blanks can be filled by Sudoku.BoardSize possibilites) 
-    for x in temp_poss_Copy:
-        poss_sum = 0                # this will sum how many values will remian in the prossibility matrix after using the carrent value of the MCV 
-        updatePoss(temp_sudoku,temp_poss,row,col,x,'removePoss')
-        for i in range(sudoku.BoardSize):       # loop through the possibility array
-            for j in range(sudoku.BoardSize):
-                poss_sum += len(temp_poss[i][j])        # Summation of how many values are remaining in the possibilty matrix for a given value
-                
-        Val_poss_sum.append(poss_sum)   # here we have a matrix of the sum of possibility for each value
-        temp_MRV.append(x)              # these are the values, but they are not sorted according to LCV
-         
-        updatePoss(temp_sudoku,temp_poss,row,col,x,'addPoss')
-
-    sorted_Val_poss_sum = sorted(Val_poss_sum)
-    for y in sorted_Val_poss_sum:
-        MRVindex = Val_poss_sum.index(y)
-        MRV_Val.append(temp_MRV[MRVindex])    ####### This is the MAIN difference from LCV ########
-        
+    constraints = peerConstraints(sudoku,poss,row,col)
+    MRV_Val = sorted(constraints, key=lambda x: (-constraints[x], x))    ####### This is the MAIN difference from LCV ########
     return MRV_Val
 
 
 def MCV_Most_Const_Var (sudoku, poss):
-    # stop when time is maxed out
-    global start_time
-    if ( time() - start_time ) > 1000000:
-        print 'Time Limit Exceeded \n'
-        return False
-        
-    # Get the Most Constraint Variable
-    row, col= MCV_Row_Col( sudoku,poss )
-    if ( row == col == -1 ): return True
-    
-    # Try the Values of the MCV
-    possCopy = copy.deepcopy(poss[row][col])
-    possCopy = Most_Const_Value(sudoku,poss,row,col)     # This will return a sorted possCopy according to remaining variables
-    for value in possCopy:
-        
-        
-        if isConsistent( sudoku.CurrentGameboard, row, col, value ):    # If the assignment is consistent
-            sudoku.set_value( row, col, value )
-            sudoku.numChecks += 1
-            updatePoss( sudoku, poss, row, col, value, 'removePoss' )
-            if ( MCV_Most_Const_Var( sudoku, poss ) ): return True             # Recursivly Assign values to the next MCV
-
-        sudoku.set_value( row, col, 0 )
-        updatePoss( sudoku, poss, row, col, value, 'addPoss' )
-                    
-    return False
+    # the Most Constraint Variable gets its values sorted with the Most Constraining Value first
+    return iterativeSearch( sudoku, poss, MCV_Row_Col, Most_Const_Value, 1000000 )
+
+
+#------------------ CACHED -----------------------------#
+
+# backtracking and MCV behind the solution cache of Sudoku_Cache: a board that is the same as one
+# solved before up to symmetry gets its solution from the cache (Sudoku_Cache.solutionCache.stats()
+# counts the hits, misses and evictions)
+backtracking_Cached = cachedSolver( backtracking )
+MCV_Cached = cachedSolver( MCV )
 
 
 """ -------------------------------- Test Code ---------------------------------"""
 
-size, num = '16', '1'
-path = 'ExtraExamples/%sx%s/%sx%s.%s.sudoku' % (size,size,size,size,num)
+if __name__ == '__main__':
+
+    size, num = '16', '1'
+    path = 'ExtraExamples/%sx%s/%sx%s.%s.sudoku' % (size,size,size,size,num)
+
+    """ ------- Backtracking -----------"""
+    print '--------Backtracking--------'
+    testBoard = init_board( path )
+    print 'Original Board: \n %s \n' % testBoard
+
+    start_time = time()
+    result = backtracking( testBoard )
+    elapsed_time = time() - start_time
+
+    print 'Backtracking, returned Board: \n %s \n' % testBoard
+    print 'Solved: %s' % result
+    print 'Number of checks: %d' % testBoard.numChecks
+    print 'Time elapsed: %.2f seconds \n' % elapsed_time
+    """-------------------------------"""
+
+
+    """ ------- Forward Checking -----------"""
+    print '--------Forward Checking--------'
+    testBoard = init_board( path )
+    print 'Original Board: \n %s \n' % testBoard
+
+    start_time = time()
+    poss = initialPoss( testBoard )
+    result = forwardChecking( testBoard, poss )
+    elapsed_time = time() - start_time
 
-""" ------- Backtracking -----------"""
-print '--------Backtracking--------'
-testBoard = init_board( path )
-print 'Original Board: \n %s \n' % testBoard
+    print 'Forward Checking, returned Board: \n %s \n' % testBoard
+    print 'Solved: %s' % result
+    print 'Number of checks: %d' % testBoard.numChecks
+    print 'Time elapsed: %.2f seconds \n' % elapsed_time
+    """------------------------------------"""
 
-start_time = time()
-result = backtracking( testBoard )
-elapsed_time = time() - start_time
 
-print 'Backtracking, returned Board: \n %s \n' % testBoard
-print 'Solved: %s' % result
-print 'Number of checks: %d' % testBoard.numChecks
-print 'Time elapsed: %.2f seconds \n' % elapsed_time
-"""-------------------------------"""
+    """ ------- Dancing Links -----------"""
+    print '--------Dancing Links--------'
+    testBoard = init_board( path )
+    print 'Original Board: \n %s \n' % testBoard
 
+    start_time = time()
+    result = dancingLinks( testBoard )
+    elapsed_time = time() - start_time
 
-""" ------- Forward Checking -----------"""
-print '--------Forward Checking--------'
-testBoard = init_board( path )
-print 'Original Board: \n %s \n' % testBoard
+    print 'Dancing Links, returned Board: \n %s \n' % testBoard
+    print 'Solved: %s' % result
+    print 'Number of checks: %d' % testBoard.numChecks
+    print 'Time elapsed: %.2f seconds \n' % elapsed_time
+    """------------------------------------"""
 
-start_time = time()
-poss = initialPoss( testBoard )
-result = forwardChecking( testBoard, poss )
-elapsed_time = time() - start_time
 
-print 'Forward Checking, returned Board: \n %s \n' % testBoard
-print 'Solved: %s' % result
-print 'Number of checks: %d' % testBoard.numChecks
-print 'Time elapsed: %.2f seconds \n' % elapsed_time
-"""------------------------------------"""
+    """ ------- SAT -----------"""
+    print '--------SAT--------'
+    testBoard = init_board( path )
+    print 'Original Board: \n %s \n' % testBoard
 
+    start_time = time()
+    result = satSolve( testBoard )
+    elapsed_time = time() - start_time
 
-""" ------------- MCV+ MRV ------------------"""
-print '--------MCV+MRV--------'
-testBoard = init_board( path )
-print 'Original Board: \n %s \n' % testBoard
+    print 'SAT, returned Board: \n %s \n' % testBoard
+    print 'Solved: %s' % result
+    print 'Number of checks: %d' % testBoard.numChecks
+    print 'Solver counters: %s' % satStats
+    print 'Time elapsed: %.2f seconds \n' % elapsed_time
+    """------------------------------------"""
 
-start_time = time()
-poss = initialPoss( testBoard )
-result = MCV(testBoard, poss)
-elapsed_time = time() - start_time
 
+    """ ------------- MCV+ MRV ------------------"""
+    print '--------MCV+MRV--------'
+    testBoard = init_board( path )
+    print 'Original Board: \n %s \n' % testBoard
 
-print 'MCV, returned Board: \n %s \n' % testBoard
-print 'Solved: %s' % result
-print 'Number of checks: %d' % testBoard.numChecks
-print 'Time elapsed: %.2f seconds \n' % elapsed_time
-"""------------------------------------"""
+    start_time = time()
+    poss = initialPoss( testBoard )
+    result = MCV(testBoard, poss)
+    elapsed_time = time() - start_time
 
 
-""" ----------- MCV + MRV +LCV -------------"""
-print '--------MCV + MRV + LCV--------'
-testBoard = init_board( path )
-print 'Original Board: \n %s \n' % testBoard
+    print 'MCV, returned Board: \n %s \n' % testBoard
+    print 'Solved: %s' % result
+    print 'Number of checks: %d' % testBoard.numChecks
+    print 'Time elapsed: %.2f seconds \n' % elapsed_time
+    """------------------------------------"""
 
-start_time = time()
-poss = initialPoss( testBoard )
-result = MCV_LCV(testBoard, poss)
-elapsed_time = time() - start_time
 
+    """ ----------- MCV + MRV +LCV -------------"""
+    print '--------MCV + MRV + LCV--------'
+    testBoard = init_board( path )
+    print 'Original Board: \n %s \n' % testBoard
 
-print 'MCV+LCV, returned Board: \n %s \n' % testBoard
-print 'Solved: %s' % result
-print 'Number of checks: %d' % testBoard.numChecks
-print 'Time elapsed: %.2f seconds \n' % elapsed_time
+    start_time = time()
+    poss = initialPoss( testBoard )
+    result = MCV_LCV(testBoard, poss)
+    elapsed_time = time() - start_time
 
-"""------------------------------------"""
 
+    print 'MCV+LCV, returned Board: \n %s \n' % testBoard
+    print 'Solved: %s' % result
+    print 'Number of checks: %d' % testBoard.numChecks
+    print 'Time elapsed: %.2f seconds \n' % elapsed_time
 
-""" ----------- MCV + MOST CONSTRAINING VALUE-------------
-print 'MCV + MOST CONSTRAINING VALUE'
-testBoard = init_board( path )
-print 'Original Board: \n %s \n' % testBoard
+    """------------------------------------"""
 
-start_time = time()
-poss = initialPoss( testBoard )
-result = MCV_Most_Const_Var(testBoard, poss)
-elapsed_time = time() - start_time
 
+    """ ----------- MCV + MOST CONSTRAINING VALUE-------------
+    print 'MCV + MOST CONSTRAINING VALUE'
+    testBoard = init_board( path )
+    print 'Original Board: \n %s \n' % testBoard
 
-print 'MCV+MOST CONSTRAINING VALUE, returned Board: \n %s \n' % testBoard
-print 'Solved: %s' % result
-print 'Number of checks: %d' % testBoard.numChecks
-print 'Time elapsed: %.2f seconds \n' % elapsed_time
+    start_time = time()
+    poss = initialPoss( testBoard )
+    result = MCV_Most_Const_Var(testBoard, poss)
+    elapsed_time = time() - start_time
 
-------------------------------------"""
 
+    print 'MCV+MOST CONSTRAINING VALUE, returned Board: \n %s \n' % testBoard
+    print 'Solved: %s' % result
+    print 'Number of checks: %d' % testBoard.numChecks
+    print 'Time elapsed: %.2f seconds \n' % elapsed_time
 
+    ------------------------------------"""
@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+# A binary corpus of boards, read through mmap so that any board can be fetched by its number
+# without parsing the file, and several processes can share the file without copying boards.
+#
+# Layout (little endian):
+#   header   'SUDOKUCO', version (uint32), number of boards (uint32), offset of the index (uint64)
+#   boards   for every board one byte for its size n, then its n*n cells row by row, a byte each
+#            (0 for a blank), so boards up to 255x255
+#   index    the offset of every board (uint64), in board order
+# The index comes last so a corpus is written in one pass over a stream of boards.
+#
+# Usage: python Sudoku_Corpus.py convert corpus file ...   (any format of Sudoku_Reader)
+#        python Sudoku_Corpus.py info corpus [number ...]
+import struct, mmap, argparse
+from array import array
+from Sudoku_Board import SudokuBoard
+from Sudoku_Reader import readAll, READERS
+
+MAGIC = 'SUDOKUCO'
+VERSION = 1
+HEADER = struct.Struct('<8sIIQ')
+OFFSET = struct.Struct('<Q')
+
+
+# Writes the boards (2d arrays [row][col], any iterable) to a corpus at path, returns how many
+def writeCorpus( path, boards ):
+    index = bytearray()
+    count = 0
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack( MAGIC, VERSION, 0, 0 ))
+        offset = HEADER.size
+        for board in boards:
+            size = len(board)
+            if size > 255: raise ValueError( 'a corpus holds boards up to 255x255, not %dx%d' % (size, size) )
+            record = bytearray([ size ])
+            for row in board: record.extend(row)
+            f.write(record)
+            index.extend(OFFSET.pack( offset ))
+            offset += len(record)
+            count += 1
+        f.write(index)
+        f.seek(0)
+        f.write(HEADER.pack( MAGIC, VERSION, count, offset ))
+    return count
+
+
+class Corpus:
+
+    # maps the corpus at path, the boards are read from the mapping when they are asked for
+    def __init__( self, path ):
+        self.path = path
+        self.file = open(path, 'rb')
+        self.map = mmap.mmap( self.file.fileno(), 0, access=mmap.ACCESS_READ )
+        magic, version, self.count, self.indexOffset = HEADER.unpack_from( self.map, 0 )
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError( '%s is not a version %d corpus' % (path, VERSION) )
+
+    def __len__( self ):
+        return self.count
+
+    # the size of board i and the offset of its first cell
+    def _locate( self, i ):
+        if not 0 <= i < self.count: raise IndexError( 'board %d of a corpus of %d' % (i, self.count) )
+        offset = OFFSET.unpack_from( self.map, self.indexOffset + i*OFFSET.size )[0]
+        return ord(self.map[offset]), offset + 1
+
+    # the size of board i
+    def size( self, i ):
+        return self._locate( i )[0]
+
+    # the cells of board i row by row as a read only buffer on the mapping, nothing is copied
+    def cells( self, i ):
+        size, start = self._locate( i )
+        return buffer( self.map, start, size*size )
+
+    # board i as a 2d array [row][col], like parse_file returns
+    def board( self, i ):
+        size, start = self._locate( i )
+        values = array( 'B', self.map[start:start+size*size] ).tolist()
+        return [ values[row*size:(row+1)*size] for row in range(size) ]
+
+    __getitem__ = board
+
+    # board i as a SudokuBoard
+    def sudoku( self, i ):
+        board = self.board( i )
+        return SudokuBoard( len(board), board, 0 )
+
+    # the boards start..stop-1 one after the other
+    def boards( self, start=0, stop=None ):
+        for i in xrange(start, self.count if stop is None else min(stop, self.count)):
+            yield self.board( i )
+
+    def close( self ):
+        self.map.close()
+        self.file.close()
+
+
+# the corpora opened by openCorpus, keyed by path
+_corpora = {}
+
+# the corpus at path, mapped once per process
+def openCorpus( path ):
+    corpus = _corpora.get(path)
+    if corpus is None:
+        corpus = _corpora[path] = Corpus( path )
+    return corpus
+
+
+# true for the path of a corpus file
+def isCorpus( path ):
+    with open(path, 'rb') as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser( description='Convert puzzle files to a corpus or look inside one.' )
+    commands = parser.add_subparsers( dest='command' )
+    convert = commands.add_parser( 'convert', help='write the boards of puzzle files to a corpus' )
+    convert.add_argument( 'corpus' )
+    convert.add_argument( 'files', nargs='+' )
+    convert.add_argument( '-f', '--format', choices=sorted(READERS), help='the format of every file' )
+    info = commands.add_parser( 'info', help='count the boards of a corpus or print some of them' )
+    info.add_argument( 'corpus' )
+    info.add_argument( 'numbers', nargs='*', type=int )
+    args = parser.parse_args()
+
+    if args.command == 'convert':
+        print '%d boards written to %s' % (writeCorpus( args.corpus, readAll( args.files, args.format ) ), args.corpus)
+    else:
+        corpus = Corpus( args.corpus )
+        if not args.numbers:
+            sizes = {}
+            for i in xrange(len(corpus)):
+                sizes[corpus.size( i )] = sizes.get(corpus.size( i ), 0) + 1
+            print '%s: %d boards, %s' % (args.corpus, len(corpus), ', '.join('%d %dx%d' % (sizes[size], size, size) for size in sorted(sizes)))
+        for i in args.numbers:
+            print 'Board %d: \n %s \n' % (i, corpus.sudoku( i ))
+        corpus.close()
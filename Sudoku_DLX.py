@@ -0,0 +1,158 @@
+#!/usr/bin/env python
+# Dancing Links (Knuth's Algorithm X) for boards of any size n = k*k.
+#
+# A board is an exact cover problem: every candidate (row, col, value) of a blank is a
+# matrix row covering four columns, "cell (row,col) is filled", "row has value",
+# "col has value" and "box has value", and a solution picks rows covering every column
+# exactly once. Columns already covered by the clues are left out, and so are the
+# candidates that clash with a clue.
+#
+# The nodes of the sparse matrix are not objects: node i is described by entry i of the
+# lists left, right, up, down and column, node 0 is the root, nodes 1..4*n*n are the
+# column headers and the matrix rows follow. Covering and uncovering only rewrite ints.
+from Sudoku_Peers import getPeers
+
+
+class DancingLinks:
+
+    def __init__( self, sudoku ):
+        size = sudoku.BoardSize
+        boxOf = getPeers(size).boxOf
+        columns = 4*size*size
+        self.left = left = range(-1, columns)
+        self.right = right = range(1, columns+1) + [ 0 ]
+        left[0] = columns
+        right[columns] = 0
+        self.up = range(columns+1)
+        self.down = range(columns+1)
+        self.column = range(columns+1)
+        self.count = [ 0 for i in range(columns+1) ]
+        self.candidate = [ None for i in range(columns+1) ]     # the (row, col, value) of every node
+
+        # take the columns the clues already cover out of the header list
+        for row in range(size):
+            for col in range(size):
+                value = sudoku.get_value( row, col )
+                if value != 0:
+                    for header in self.headers( size, row, col, value, boxOf[row][col] ):
+                        right[left[header]] = right[header]
+                        left[right[header]] = left[header]
+
+        for row in range(size):
+            for col in range(size):
+                if sudoku.get_value( row, col ) != 0: continue
+                for value in range(1, size+1):
+                    if sudoku.is_consistent( row, col, value ):
+                        self.addRow( (row, col, value), self.headers( size, row, col, value, boxOf[row][col] ) )
+
+    # the header nodes of the four columns a candidate covers
+    def headers( self, size, row, col, value, box ):
+        n2 = size*size
+        return ( 1 + row*size + col, 1 + n2 + row*size + value-1,
+                 1 + 2*n2 + col*size + value-1, 1 + 3*n2 + box*size + value-1 )
+
+    # appends a matrix row with one node under each of the given headers
+    def addRow( self, candidate, headers ):
+        left, right, up, down = self.left, self.right, self.up, self.down
+        first = len(left)
+        for i, header in enumerate(headers):
+            node = first + i
+            left.append(node-1 if i else first + len(headers)-1)
+            right.append(node+1 if i < len(headers)-1 else first)
+            up.append(up[header])
+            down.append(header)
+            down[up[header]] = node
+            up[header] = node
+            self.column.append(header)
+            self.candidate.append(candidate)
+            self.count[header] += 1
+
+    def cover( self, header ):
+        left, right, up, down, column, count = self.left, self.right, self.up, self.down, self.column, self.count
+        right[left[header]] = right[header]
+        left[right[header]] = left[header]
+        i = down[header]
+        while i != header:
+            j = right[i]
+            while j != i:
+                down[up[j]] = down[j]
+                up[down[j]] = up[j]
+                count[column[j]] -= 1
+                j = right[j]
+            i = down[i]
+
+    def uncover( self, header ):
+        left, right, up, down, column, count = self.left, self.right, self.up, self.down, self.column, self.count
+        i = up[header]
+        while i != header:
+            j = left[i]
+            while j != i:
+                count[column[j]] += 1
+                down[up[j]] = j
+                up[down[j]] = j
+                j = left[j]
+            i = up[i]
+        right[left[header]] = header
+        left[right[header]] = header
+
+    # the uncovered column with the fewest rows (Knuth's S heuristic), 0 when every column is covered
+    def smallestColumn( self ):
+        right, count = self.right, self.count
+        best, fewest = 0, None
+        header = right[0]
+        while header != 0:
+            if fewest is None or count[header] < fewest:
+                best, fewest = header, count[header]
+                if fewest <= 1: break
+            header = right[header]
+        return best
+
+    # Algorithm X without recursion: chosen holds the row node picked on every level.
+    # Returns the chosen candidates, or None when the board has no solution.
+    # tries counts the rows that were tried, the numChecks of the other solvers.
+    def search( self ):
+        right, left, down, column = self.right, self.left, self.down, self.column
+        chosen = []
+        self.tries = 0
+        node = None
+        while True:
+            if node is None:            # go one level deeper
+                header = self.smallestColumn()
+                if header == 0:
+                    return [ self.candidate[i] for i in chosen ]
+                self.cover( header )
+                node = down[header]
+            else:                       # take back the row tried on this level and move to the next one
+                j = left[node]
+                while j != node:
+                    self.uncover( column[j] )
+                    j = left[j]
+                header = column[node]
+                node = down[node]
+
+            if node == header:          # no row left in this column, go back up
+                self.uncover( header )
+                if not chosen: return None
+                node = chosen.pop()
+                continue
+
+            self.tries += 1
+            chosen.append(node)
+            j = right[node]
+            while j != node:
+                self.cover( column[j] )
+                j = right[j]
+            node = None
+
+
+# solves the board in place with Dancing Links, like the other solvers of Sudoku_Complete
+def dancingLinks( sudoku ):
+    links = DancingLinks( sudoku )
+    try:        # the tries are added even when the search is interrupted (see iterativeSearch)
+        solution = links.search()
+    finally:
+        sudoku.numChecks += links.tries
+    if solution is None: return False
+    for row, col, value in solution:
+        sudoku.set_value( row, col, value )
+    return True
@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+# Bitmask candidate domains shared by the solvers.
+# A domain is a plain int where bit (value-1) is set when value is still possible,
+# so a cell of a 25x25 board needs a single 25 bit int instead of a list of values.
+from Sudoku_Peers import getPeers
+
+
+# the bit standing for a value in a domain mask
+def valueBit( value ):
+    return 1 << (value - 1)
+
+
+# a domain holding every value 1..size
+def fullMask( size ):
+    return (1 << size) - 1
+
+
+# number of values left in a domain (used as the MRV key)
+def popcount( mask ):
+    return bin(mask).count('1')
+
+
+# the values of a domain in increasing order, peeling off the lowest set bit each time
+def maskValues( mask ):
+    values = []
+    while mask:
+        low = mask & -mask
+        values.append(low.bit_length())
+        mask ^= low
+    return values
+
+
+# the smallest value of a non empty domain
+def lowestValue( mask ):
+    return (mask & -mask).bit_length()
+
+
+# The possibility matrix, a list of rows of domain masks (poss[row][col]).
+# It also carries the trail: every (row, col, value) pruned from a domain is
+# pushed on it, so a search can take back exactly what an assignment removed
+# by popping the trail down to the length it had before. An entry with value 0
+# marks a blank that was assigned.
+# support[unit][value] counts the blanks of a unit (see PeerTable.units) whose
+# domain still holds value; whoever prunes or restores the domain of a blank keeps
+# it current, and take/release move a blank's whole domain out of and back into it.
+# sizes[row][col] is the number of values left in a domain, and buckets[k] is a mask
+# with bit row*n+col set for every blank with k values left, so the most constrained
+# blank, the first in row major order, is the lowest bit of the first bucket that is
+# not empty.
+class PossMatrix(list):
+
+    def __init__( self, rows ):
+        list.__init__(self, rows)
+        self.trail = []
+        table = getPeers(len(rows))
+        self.support = [ [ 0 for value in range(len(rows)+1) ] for unit in table.units ]
+        self.sizes = [ [ popcount(mask) for mask in row ] for row in rows ]
+        self.buckets = [ 0 for k in range(len(rows)+1) ]
+
+    # puts every blank of the board (a flat array of values) in the bucket of its domain size
+    # and counts its domain in the support of its units
+    def queueBlanks( self, cells ):
+        size = len(self)
+        for row in range(size):
+            for col in range(size):
+                if cells[row*size + col] == 0:
+                    self.buckets[self.sizes[row][col]] |= 1 << (row*size + col)
+                    self._count( row, col, 1 )
+
+    # takes an assigned blank out of the buckets and records it on the trail
+    def take( self, row, col ):
+        cell = 1 << (row*len(self) + col)
+        if self.buckets[self.sizes[row][col]] & cell:
+            self.buckets[self.sizes[row][col]] ^= cell
+            self._count( row, col, -1 )
+            self.trail.append((row, col, 0))
+
+    # removes value from the domain of the blank (row,col) and pushes it on the trail
+    # (updatePoss does the same inline for the peers of an assignment)
+    def remove( self, row, col, value ):
+        self[row][col] &= ~valueBit(value)
+        self.trail.append((row, col, value))
+        size = self.sizes[row][col]
+        self.sizes[row][col] = size - 1
+        cell = 1 << (row*len(self) + col)
+        if self.buckets[size] & cell:
+            self.buckets[size] ^= cell
+            self.buckets[size-1] |= cell
+            for unit in getPeers(len(self)).unitsOf[row][col]: self.support[unit][value] -= 1
+
+    # puts a blank taken by take back in its bucket
+    def release( self, row, col ):
+        self.buckets[self.sizes[row][col]] |= 1 << (row*len(self) + col)
+        self._count( row, col, 1 )
+
+    # the blanks of buckets[k] in row major order
+    def bucketCells( self, k ):
+        return [ divmod( cell - 1, len(self) ) for cell in maskValues(self.buckets[k]) ]
+
+    # the blank with the fewest values left, the first in row major order among those,
+    # or (-1,-1) when no blank is left
+    def mostConstrained( self ):
+        for bucket in self.buckets:
+            if bucket: return divmod( lowestValue(bucket) - 1, len(self) )
+        return -1, -1
+
+    # adds step to the support of every value of the domain of (row,col) in each of its units
+    def _count( self, row, col, step ):
+        values = maskValues(self[row][col])
+        for unit in getPeers(len(self)).unitsOf[row][col]:
+            counts = self.support[unit]
+            for value in values: counts[value] += step
@@ -1,34 +1,6 @@
 #!/usr/bin/env python
 import struct, string, math
-
-#this will be the game object your player will manipulate
-class SudokuBoard:
-
-    #the constructor for the SudokuBoard
-    def __init__(self, size, board, checks):
-      self.BoardSize = size #the size of the board
-      self.CurrentGameboard= board #the current state of the game board
-      self.checks = checks
-
-    #This function will create a new sudoku board object
-    #with the input value placed on the GameBoard row and col are
-    #both zero-indexed
-    def set_value(self, row, col, value):
-        self.CurrentGameboard[row][col]=value #add the value to the appropriate position on the board
-        return SudokuBoard(self.BoardSize, self.CurrentGameboard, self.checks) #return a new board of the same size with the value added
-
-    def __repr__(self):
-        """ returns a string representation for a SudokuBoard """
-        s = dashes = "".join([ ' -' for i in range(self.BoardSize) ])
-        for row in range( self.BoardSize ):
-            sRow = '|'
-            for col in range( self.BoardSize ):
-                sRow += str(self.CurrentGameboard[row][col]) + '|'
-            s += '\n' + sRow + '\n' + dashes
-        return s
-
-    
-
+from Sudoku_Board import SudokuBoard
 
 # parse_file
 #this function will parse a sudoku text file (like those posted on the website)
@@ -97,37 +69,29 @@ def init_board( file_name, checks ):
 # student code
 def backtracking( sudoku ):
     # stop when limit is reached
-    ##sudoku.checks -= 1
-    ##if sudoku.checks<0: return False
+    ##sudoku.numChecks -= 1
+    ##if sudoku.numChecks<0: return False
     # get an unassigned cell
     row, col = getUnassignedVar( sudoku )
     if (row == -1 and col == -1): return True
     # try different values for a cell
     for val in range(1, sudoku.BoardSize+1):
-        sudoku.set_value(row,col,val)
-        sudoku.checks -= 1
-        if sudoku.checks<0: return False
-        if iscomplete(sudoku.CurrentGameboard) and backtracking( sudoku ):
-            return True
-        sudoku.set_value(row,col,0)
+        sudoku.numChecks -= 1
+        if sudoku.numChecks<0: return False
+        if sudoku.is_consistent(row,col,val):
+            sudoku.set_value(row,col,val)
+            if backtracking( sudoku ): return True
+            sudoku.set_value(row,col,0)
     return False
 
 def getUnassignedVar( sudoku ):
     for row in range(sudoku.BoardSize):
         for col in range(sudoku.BoardSize):
-            if (sudoku.CurrentGameboard[row][col] == 0): return row, col
+            if (sudoku.get_value(row, col) == 0): return row, col
     return -1, -1
 
 """ -------------------------------- Forward Checking ---------------------------------"""
 
-def isConsistent(BoardArray, row, col, val):
-    temp = BoardArray[row][col]
-    BoardArray[row][col] = val
-    result = iscomplete( BoardArray )
-    BoardArray [row][col] = temp
-    return result
-
-
 def createPossMatrix( sudoku ):
     poss = [[range(1,sudoku.BoardSize+1) for row in range(sudoku.BoardSize)] for col in range(sudoku.BoardSize)]
     return poss
@@ -155,7 +119,7 @@ def AddtoPoss2( sudoku,poss, r, c, val ): # This function will be used to re-add
     temp_sudoku = sudoku
     for x in range(size):
         temp_sudoku.set_value(r,x,val)
-        if isConsistent(temp_sudoku, r, c, val):
+        if temp_sudoku.is_consistent(r, c, val):
             if (val not in poss[r][x]):
                 poss[r][x].append(val)   # Adds possibilites in the same row
                 poss[r][x].sort()
@@ -176,15 +140,15 @@ def AddtoPoss2( sudoku,poss, r, c, val ): # This function will be used to re-add
 def AddtoPoss( sudoku, poss, r, c, val ): # This function will be used to re-add the values to the rows and columns (same as updatePoss, but reverse purpose)
     size = sudoku.BoardSize 
     for i in range(size):
-        if (val not in poss[r][i] and isConsistent( sudoku.CurrentGameboard,r,i,val )): poss[r][i].append(val)   # Adds possibilites in the same row
-        if (val not in poss[i][c] and isConsistent( sudoku.CurrentGameboard,i,c,val )): poss[i][c].append(val)   # Adds possibilites in the same Column
+        if (val not in poss[r][i] and sudoku.is_consistent(r,i,val)): poss[r][i].append(val)   # Adds possibilites in the same row
+        if (val not in poss[i][c] and sudoku.is_consistent(i,c,val)): poss[i][c].append(val)   # Adds possibilites in the same Column
         #determine which square the cell is in (Updates within the grid)
         subsquare = int(math.sqrt(size))
         SquareRow = r // subsquare
         SquareCol = c // subsquare
         for i in range(subsquare):
             for j in range(subsquare):
-                if( val not in poss[SquareRow*subsquare + i][SquareCol*subsquare + j] and isConsistent( sudoku.CurrentGameboard,i,j,val ) ):
+                if( val not in poss[SquareRow*subsquare + i][SquareCol*subsquare + j] and sudoku.is_consistent(SquareRow*subsquare + i,SquareCol*subsquare + j,val) ):
                     poss[SquareRow*subsquare + i][SquareCol*subsquare + j].append(val)
     return poss
 
@@ -192,7 +156,7 @@ def preProcess( sudoku ):
     poss = createPossMatrix( sudoku )
     for row in range(sudoku.BoardSize):
         for col in range(sudoku.BoardSize):
-            val = sudoku.CurrentGameboard[row][col]
+            val = sudoku.get_value(row, col)
             if (val != 0):
                 poss[row][col] = []
                 poss = updatePoss (poss, row, col, val)
@@ -206,8 +170,8 @@ def PrintPoss(poss):    # This function is to display the possibility matrix
 
 def forwardChecking( sudoku, poss ):
     # stop when limit is reached
-    ##sudoku.checks -= 1
-    ##if sudoku.checks<0: return False
+    ##sudoku.numChecks -= 1
+    ##if sudoku.numChecks<0: return False
     # get an unassigned cell
     row, col = getUnassignedVar( sudoku )
     if (row == -1 and col == -1):
@@ -217,9 +181,9 @@ def forwardChecking( sudoku, poss ):
     for val in poss[row][col]:          # Here we loop only through the values in Possibility Matrix
         #sudoku.set_value(row,col,val)
         #updatePoss(poss,row,col,val)    # Update the Possibility Matrix
-        sudoku.checks -= 1
-        if sudoku.checks<0: return False
-        if isConsistent(sudoku.CurrentGameboard, row, col, val):
+        sudoku.numChecks -= 1
+        if sudoku.numChecks<0: return False
+        if sudoku.is_consistent(row, col, val):
             sudoku.set_value(row,col,val)
             updatePoss(poss,row,col,val)
             #print testBoard
@@ -243,4 +207,4 @@ print 'Original Board:\n', testBoard
 poss = preProcess( testBoard )
 print '\nSolved: %s\n' % forwardChecking( testBoard,poss )
 print 'Returned Board:\n', testBoard
-print numchecks - testBoard.checks
+print numchecks - testBoard.numChecks
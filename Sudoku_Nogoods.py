@@ -0,0 +1,36 @@
+#!/usr/bin/env python
+# A bounded store of nogoods: sets of (row, col, value) assignments known to lead to no solution.
+# Every nogood is filed under each of its assignments, so after placing a value only the nogoods
+# holding that assignment have to be looked at. When the store is full the oldest nogood goes.
+from collections import OrderedDict
+
+
+class NogoodStore:
+
+    def __init__( self, limit, maxSize ):
+        self.limit = limit          # the most nogoods kept
+        self.maxSize = maxSize      # longer nogoods are not kept, they hardly ever match again
+        self.nogoods = OrderedDict()
+        self.watch = {}
+        self.added = self.evicted = self.hits = 0
+
+    # keeps a nogood (a frozenset of (row, col, value))
+    def add( self, nogood ):
+        if not nogood or len(nogood) > self.maxSize or nogood in self.nogoods: return
+        self.nogoods[nogood] = None
+        for assignment in nogood:
+            self.watch.setdefault(assignment, set()).add(nogood)
+        self.added += 1
+        if len(self.nogoods) > self.limit:
+            oldest = self.nogoods.popitem(last=False)[0]
+            for assignment in oldest:
+                self.watch[assignment].discard(oldest)
+            self.evicted += 1
+
+    # a kept nogood that holds completely now that value was placed at (row,col), None if there is none
+    def violated( self, sudoku, row, col, value ):
+        for nogood in self.watch.get((row, col, value), ()):
+            if all(sudoku.get_value( i, j ) == other for i, j, other in nogood):
+                self.hits += 1
+                return nogood
+        return None
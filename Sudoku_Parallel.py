@@ -0,0 +1,139 @@
+#!/usr/bin/env python
+# Solves one board with several processes searching different subtrees of the MCV search.
+#
+# A task is a list of decisions (row, col, value): a worker replays them on a fresh board with
+# the same propagation as the search, then searches the subtree below them with
+# Sudoku_Complete.iterativeSearch. The first task is the whole tree. Whenever a worker waits for
+# work, the busy workers steal work for it from themselves: at their next clock check they give
+# away the untried values of their shallowest open level, each as a new task, and skip those
+# values themselves. The first solution found stops every worker; when the last task is done
+# without one the board has no solution.
+#
+# Usage: python Sudoku_Parallel.py [-j workers] [-t seconds] board
+import argparse, multiprocessing
+from Queue import Empty
+from time import time
+import Sudoku_Complete
+from Sudoku_Complete import init_board, initialPoss, updatePoss, propagate, iterativeSearch, \
+                            MCV_Row_Col, ascendingValues, HIDDEN_SINGLES
+
+
+# replays the decisions of a task on the board, False when they can't all be made
+def replay( sudoku, poss, decisions, propagation ):
+    if not propagate( sudoku, poss, None, propagation ): return False
+    for row, col, value in decisions:
+        if sudoku.get_value( row, col ) != 0 or not sudoku.is_consistent( row, col, value ): return False
+        sudoku.set_value( row, col, value )
+        sudoku.numChecks += 1
+        mark = len(poss.trail)
+        updatePoss( sudoku, poss, row, col, value, 'removePoss' )
+        if not propagate( sudoku, poss, mark, propagation ): return False
+    return True
+
+
+# adds a task, pending counts the tasks given out and not finished yet
+def addTask( tasks, pending, decisions ):
+    with pending.get_lock():
+        pending.value += 1
+    tasks.put(decisions)
+
+
+# the loop of one worker process, results get ('solved', cells), ('done', None), ('timeout', None)
+# or ('error', message). The time limit counts from the start of the worker, not of every task.
+def worker( path, propagation, timeLimit, tasks, results, pending, idle, stop, stolen, checks ):
+    Sudoku_Complete.start_time = time()
+    try:
+        while not stop.is_set():
+            with idle.get_lock():
+                idle.value += 1
+            try:
+                decisions = tasks.get( timeout=0.05 )
+            except Empty:
+                continue
+            finally:
+                with idle.get_lock():
+                    idle.value -= 1
+
+            sudoku = init_board( path )
+            poss = initialPoss( sudoku )
+
+            # gives the untried values of the shallowest open level to the idle workers
+            def share( level, rows, cols, choices, tried ):
+                if stop.is_set(): return False
+                if idle.value > 0:
+                    for top in range(level+1):
+                        if tried[top] < len(choices[top]):
+                            prefix = decisions + [ (rows[i], cols[i], choices[i][tried[i]-1]) for i in range(top) ]
+                            for value in choices[top][tried[top]:]:
+                                addTask( tasks, pending, prefix + [ (rows[top], cols[top], value) ] )
+                                with stolen.get_lock():
+                                    stolen.value += 1
+                            tried[top] = len(choices[top])
+                            break
+                return True
+
+            solved = replay( sudoku, poss, decisions, propagation ) and \
+                     iterativeSearch( sudoku, poss, MCV_Row_Col, ascendingValues, timeLimit, propagation, share )
+            with checks.get_lock():
+                checks.value += sudoku.numChecks
+            if solved is None:      # out of time, the subtree was not searched to the end
+                stop.set()
+                results.put(('timeout', None))
+                return
+            if solved and not stop.is_set():
+                stop.set()
+                results.put(('solved', sudoku.cells.tolist()))
+                return
+            with pending.get_lock():
+                pending.value -= 1
+                if pending.value == 0: results.put(('done', None))
+    except Exception as error:
+        stop.set()
+        results.put(('error', repr(error)))
+
+
+# Solves the board at path on the given number of processes.
+# Returns (solved, board, checks, tasks stolen): solved is None when timeLimit ran out, the board is
+# filled in when it was solved and checks adds up the checks of every worker.
+def parallelSolve( path, workers, timeLimit, propagation=HIDDEN_SINGLES ):
+    tasks, results = multiprocessing.Queue(), multiprocessing.Queue()
+    pending, idle, stolen, checks = [ multiprocessing.Value('i', 0) for i in range(4) ]
+    stop = multiprocessing.Event()
+    addTask( tasks, pending, [] )
+    processes = [ multiprocessing.Process( target=worker, args=(path, propagation, timeLimit, tasks, results,
+                                                                 pending, idle, stop, stolen, checks) )
+                  for i in range(workers) ]
+    for process in processes: process.start()
+
+    sudoku = init_board( path )
+    try:
+        kind, value = results.get( timeout=timeLimit )
+    except Empty:
+        kind, value = 'timeout', None
+    finally:
+        stop.set()
+        for process in processes:
+            process.join( 1 )
+            if process.is_alive(): process.terminate()
+
+    if kind == 'error': raise RuntimeError( 'worker failed: %s' % value )
+    if kind == 'solved':
+        for index, cell in enumerate(value):
+            sudoku.set_value( index // sudoku.BoardSize, index % sudoku.BoardSize, cell )
+    solved = { 'solved': True, 'done': False }.get(kind)
+    return solved, sudoku, checks.value, stolen.value
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser( description='Solve one board on several processes.' )
+    parser.add_argument( 'board', help='a .sudoku file' )
+    parser.add_argument( '-j', '--workers', type=int, default=multiprocessing.cpu_count(), help='worker processes' )
+    parser.add_argument( '-t', '--time-limit', type=int, default=600, help='seconds' )
+    args = parser.parse_args()
+
+    start = time()
+    solved, sudoku, checks, stolen = parallelSolve( args.board, max(1, args.workers), args.time_limit )
+    print 'Returned Board: \n %s \n' % sudoku
+    print 'Solved: %s' % ('timeout' if solved is None else solved)
+    print 'Number of checks: %d (%d subtrees stolen)' % (checks, stolen)
+    print 'Time elapsed: %.2f seconds' % (time() - start)
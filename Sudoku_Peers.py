@@ -0,0 +1,55 @@
+#!/usr/bin/env python
+import math
+
+# Row, column and box tables for one board size.
+# Every solver used to rebuild these on each check, now they are built
+# once per size by getPeers and shared through the cache below.
+class PeerTable:
+
+    def __init__( self, size ):
+        self.size = size
+        self.subsquare = int(round(math.sqrt(size)))
+        sub = self.subsquare
+
+        # the cells of every row, column and box
+        self.rows = [ [ (row,col) for col in range(size) ] for row in range(size) ]
+        self.cols = [ [ (row,col) for row in range(size) ] for col in range(size) ]
+        self.boxes = [ [ ((box//sub)*sub + i, (box%sub)*sub + j) for i in range(sub) for j in range(sub) ]
+                       for box in range(size) ]
+
+        # the box each cell belongs to
+        self.boxOf = [ [ (row//sub)*sub + col//sub for col in range(size) ] for row in range(size) ]
+
+        # every unit as one list: the rows, then the columns, then the boxes, followed by the
+        # row segments and column segments (the part of a row or column lying inside one box)
+        self.rowSegments = [ [ (row, stack*sub + j) for j in range(sub) ] for row in range(size) for stack in range(sub) ]
+        self.colSegments = [ [ (band*sub + i, col) for i in range(sub) ] for col in range(size) for band in range(sub) ]
+        self.units = self.rows + self.cols + self.boxes + self.rowSegments + self.colSegments
+
+        # the (row, column, box, row segment, column segment) unit numbers of every cell
+        self.unitsOf = [ [ ( row, size + col, 2*size + self.boxOf[row][col],
+                             3*size + row*sub + col//sub, 3*size + size*sub + col*sub + row//sub )
+                           for col in range(size) ] for row in range(size) ]
+
+        # the cells sharing a row, column or box with a cell (row first, then column, then box)
+        self.peers = [ [ self._buildPeers(row, col) for col in range(size) ] for row in range(size) ]
+
+    def _buildPeers( self, row, col ):
+        peers = []
+        seen = set([ (row,col) ])
+        for cell in self.rows[row] + self.cols[col] + self.boxes[self.boxOf[row][col]]:
+            if cell not in seen:
+                seen.add(cell)
+                peers.append(cell)
+        return tuple(peers)
+
+
+# the peer tables built so far, keyed by board size
+_peerTables = {}
+
+# returns the peer table for a board size, building it the first time the size is seen
+def getPeers( size ):
+    table = _peerTables.get(size)
+    if table is None:
+        table = _peerTables[size] = PeerTable(size)
+    return table
@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+# Races several algorithms of Sudoku_Benchmark on the same board, each in its own process.
+# The first one to come back with an answer wins and the others are terminated. Over many boards
+# the winners are counted per board size, to see which algorithm to put first for each size.
+#
+# Usage: python Sudoku_Portfolio.py [-s algorithm,algorithm,...] [-t seconds] path_or_glob ...
+# e.g.   python Sudoku_Portfolio.py -s MCV_Rules,satSolve,dancingLinks ExtraExamples/25x25
+import sys, argparse, multiprocessing
+from Queue import Empty
+from time import time
+import Sudoku_Benchmark
+from Sudoku_Batch import puzzlePaths
+
+# the algorithms raced when none are given
+PORTFOLIO = [ 'MCV_Rules', 'MCV_DomWdeg', 'dancingLinks', 'satSolve' ]
+
+
+# runs in the process of one algorithm, reports (name, solved, checks, seconds, cells) on the queue
+def runStrategy( name, path, timeLimit, results ):
+    Sudoku_Benchmark.TIME_LIMIT = timeLimit
+    sudoku = Sudoku_Benchmark.Sudoku_Complete.init_board( path )
+    result, checks, elapsed = Sudoku_Benchmark.runBoard( name, path, sudoku )
+    results.put((name, result, checks, elapsed, sudoku.cells.tolist()))
+
+
+# Starts every algorithm on the board and waits for the first that solves it or shows it has no
+# solution (a timeout is no answer). Returns (winner, solved, checks, seconds, cells), with winner
+# None when no algorithm answered within timeLimit.
+def portfolioSolve( path, names, timeLimit ):
+    results = multiprocessing.Queue()
+    processes = [ multiprocessing.Process( target=runStrategy, args=(name, path, timeLimit, results) ) for name in names ]
+    for process in processes: process.start()
+    answer = ( None, None, 0, 0.0, None )
+    try:
+        for i in range(len(processes)):
+            try:
+                name, result, checks, elapsed, cells = results.get( timeout=timeLimit + 5 )
+            except Empty:
+                break
+            if result is not None:
+                answer = ( name, result, checks, elapsed, cells )
+                break
+    finally:
+        for process in processes:
+            if process.is_alive(): process.terminate()
+            process.join()
+    return answer
+
+
+def portfolio( paths, names, timeLimit ):
+    wins = {}       # size -> name -> boards won
+    for path in paths:
+        start = time()
+        winner, result, checks, elapsed, cells = portfolioSolve( path, names, timeLimit )
+        size = Sudoku_Benchmark.Sudoku_Complete.init_board( path ).BoardSize
+        wins.setdefault(size, {})
+        wins[size][winner] = wins[size].get(winner, 0) + 1
+        print '%-40s %-18s %-8s %10d checks %8.2f seconds (%.2f wall)' % (path, winner or '-',
+              'timeout' if result is None else result, checks, elapsed, time() - start)
+        sys.stdout.flush()
+
+    for size in sorted(wins):
+        print '%dx%d winners: %s' % (size, size, ', '.join('%s %d' % (name or 'none', count)
+                                     for name, count in sorted(wins[size].items(), key=lambda item: -item[1])))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser( description='Race several algorithms on every board.' )
+    parser.add_argument( 'patterns', nargs='+', help='directories or glob patterns of .sudoku files' )
+    parser.add_argument( '-s', '--strategies', default=','.join(PORTFOLIO), help='comma separated algorithms' )
+    parser.add_argument( '-t', '--time-limit', type=int, default=Sudoku_Benchmark.TIME_LIMIT, help='seconds per board' )
+    args = parser.parse_args()
+
+    names = args.strategies.split(',')
+    for name in names:
+        if name not in Sudoku_Benchmark.ALGORITHMS:
+            print 'Unknown algorithm: %s (choose from %s)' % (name, ', '.join(sorted(Sudoku_Benchmark.ALGORITHMS)))
+            sys.exit(2)
+    paths = puzzlePaths( args.patterns )
+    if not paths:
+        print 'No boards found'
+        sys.exit(2)
+    portfolio( paths, names, args.time_limit )
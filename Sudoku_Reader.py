@@ -0,0 +1,157 @@
+#!/usr/bin/env python
+# Streams the boards of puzzle files one at a time, each as a 2d array [row][col] with 0 for a blank
+# (what parse_file returns), so a file of a million boards is read in constant memory.
+# The files are read in chunks of CHUNK_SIZE bytes and closed as soon as the caller is done.
+#
+# Three formats are understood, and a file may hold any number of boards of one format:
+#   'sudoku'  the ExtraExamples records: the board size, the number of clues, then a
+#             'row col value' line (counted from 1) for every clue
+#   'grid'    the .sdk layout of Sudoku Solutions.py: a line of size values or dashes separated
+#             by blanks for every row; '|' tokens and ruler lines like '------+------' are skipped
+#   'line'    a board on one line of 81, 256 or 625 characters, digits then letters
+#             (A is 10) for the values and '.', '0' or '-' for a blank
+# When no format is given it comes from the file extension, or else from the first line.
+#
+# Usage: python Sudoku_Reader.py [-f format] file ...   (counts the boards of every size)
+import sys, argparse, math
+
+CHUNK_SIZE = 1 << 16
+
+EXTENSIONS = { '.sudoku': 'sudoku', '.sdk': 'grid' }
+
+# the value of every character of the one line format
+LINE_VALUES = dict( [ (blank, 0) for blank in '.0-' ] +
+                    [ (char, value) for value, char in enumerate('123456789ABCDEFGHIJKLMNOP', 1) ] +
+                    [ (char, value) for value, char in enumerate('abcdefghijklmnop', 10) ] )
+LINE_LENGTHS = dict( (size*size, size) for size in (9, 16, 25) )
+
+
+# the lines of an open file without their line ends, read CHUNK_SIZE bytes at a time
+def chunkLines( f ):
+    rest = ''
+    while True:
+        chunk = f.read(CHUNK_SIZE)
+        if not chunk: break
+        lines = (rest + chunk).split('\n')
+        rest = lines.pop()
+        for line in lines: yield line.rstrip('\r')
+    if rest: yield rest.rstrip('\r')
+
+
+# the format of a file: from its extension, or else from its first line that is not empty
+def puzzleFormat( path ):
+    for extension, format in EXTENSIONS.items():
+        if path.endswith(extension): return format
+    with open(path, 'r') as f:
+        for line in chunkLines( f ):
+            tokens = line.split()
+            if not tokens: continue
+            if len(tokens) == 1 and tokens[0].isdigit() and len(tokens[0]) not in LINE_LENGTHS: return 'sudoku'
+            if len(tokens[0]) in LINE_LENGTHS: return 'line'
+            return 'grid'
+    return 'sudoku'
+
+
+# a ValueError naming the place of a bad line
+def formatError( path, number, message ):
+    return ValueError( '%s line %d: %s' % (path, number, message) )
+
+
+# the boards of a file in the 'sudoku' format
+def sudokuBoards( path, lines ):
+    board, size, clues = None, None, 0
+    for number, line in enumerate(lines, 1):
+        tokens = line.split()
+        if not tokens: continue
+        try:
+            if size is None:
+                size = int(tokens[0])
+            elif board is None:
+                clues = int(tokens[0])
+                board = [ [ 0 for col in range(size) ] for row in range(size) ]
+            else:
+                row, col, value = int(tokens[0]), int(tokens[1]), int(tokens[2])
+                board[row-1][col-1] = value
+                clues -= 1
+        except (ValueError, IndexError):
+            raise formatError( path, number, 'expected %s' % ('a clue' if board else 'a number') )
+        if board is not None and clues == 0:
+            yield board
+            board, size = None, None
+    if size is not None: raise formatError( path, number, 'the last board is cut short' )
+
+
+# the value of a token of the 'grid' format
+def gridValue( token ):
+    return 0 if token in ('-', '.') else int(token)
+
+
+# the boards of a file in the 'grid' format
+def gridBoards( path, lines ):
+    board = []
+    for number, line in enumerate(lines, 1):
+        tokens = [ token for token in line.split() if token != '|' ]
+        if not tokens or ( len(tokens) == 1 and len(tokens[0]) > 1 and not tokens[0].strip('-+=') ): continue
+        try:
+            row = [ gridValue( token ) for token in tokens ]
+        except ValueError:
+            raise formatError( path, number, 'expected numbers or dashes' )
+        if board and len(row) != len(board[0]):
+            raise formatError( path, number, 'expected %d values, found %d' % (len(board[0]), len(row)) )
+        board.append(row)
+        if len(board) == len(row):
+            if int(round(math.sqrt(len(row))))**2 != len(row):
+                raise formatError( path, number, 'a board of size %d has no boxes' % len(row) )
+            yield board
+            board = []
+    if board: raise formatError( path, number, 'the last board is cut short' )
+
+
+# the boards of a file in the 'line' format, anything after the first token of a line is ignored
+def lineBoards( path, lines ):
+    for number, line in enumerate(lines, 1):
+        tokens = line.split()
+        if not tokens: continue
+        size = LINE_LENGTHS.get(len(tokens[0]))
+        try:
+            values = [ LINE_VALUES[char] for char in tokens[0] ]
+        except KeyError:
+            values = None
+        if size is None or values is None or max(values) > size:
+            raise formatError( path, number, 'not a board of 81, 256 or 625 values' )
+        yield [ values[row*size:(row+1)*size] for row in range(size) ]
+
+
+READERS = { 'sudoku': sudokuBoards, 'grid': gridBoards, 'line': lineBoards }
+
+# Yields the boards of the file at path one after the other.
+# The file stays open only while the boards are read, closing the generator closes it.
+def readPuzzles( path, format=None ):
+    boards = READERS[format or puzzleFormat( path )]
+    with open(path, 'r') as f:
+        for board in boards( path, chunkLines( f ) ):
+            yield board
+
+
+# Yields the boards of several files in turn.
+def readAll( paths, format=None ):
+    for path in paths:
+        for board in readPuzzles( path, format ):
+            yield board
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser( description='Count the boards of puzzle files.' )
+    parser.add_argument( 'files', nargs='+' )
+    parser.add_argument( '-f', '--format', choices=sorted(READERS), help='the format of every file' )
+    args = parser.parse_args()
+
+    sizes = {}
+    try:
+        for board in readAll( args.files, args.format ):
+            sizes[len(board)] = sizes.get(len(board), 0) + 1
+    except (IOError, ValueError) as error:
+        print error
+        sys.exit(1)
+    for size in sorted(sizes):
+        print '%dx%d: %d boards' % (size, size, sizes[size])
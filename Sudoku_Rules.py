@@ -0,0 +1,180 @@
+#!/usr/bin/env python
+# Deduction rules stronger than singles, working on the possibility matrix (see Sudoku_Domains).
+# Every rule gets the row, column and box units whose candidates changed (numbered as in
+# PeerTable.units), removes what it can prove impossible with PossMatrix.remove so it lands
+# on the trail like any other pruning, and returns the number of candidates it removed.
+from time import time
+from itertools import combinations
+from Sudoku_Domains import valueBit, popcount, maskValues
+from Sudoku_Peers import getPeers
+
+
+# the blanks of a unit
+def unitBlanks( sudoku, unit ):
+    size = sudoku.BoardSize
+    return [ (row, col) for row, col in getPeers(size).units[unit] if sudoku.cells[row*size + col] == 0 ]
+
+
+# removes value from every blank of a unit except those in keep, returns how many it removed
+def removeFrom( sudoku, poss, unit, value, keep ):
+    removed = 0
+    bit = valueBit(value)
+    for row, col in unitBlanks( sudoku, unit ):
+        if poss[row][col] & bit and (row, col) not in keep:
+            poss.remove( row, col, value )
+            removed += 1
+    return removed
+
+
+# Pointing pairs: when the blanks of a box that can hold a value all lie in one row (or column),
+# the value goes in that part of the row and can be removed from the rest of it.
+# The blanks of a segment holding the value are counted by support, so no cell is looked at
+# unless something can be removed.
+def pointingPairs( sudoku, poss, units ):
+    size = sudoku.BoardSize
+    table = getPeers(size)
+    sub = table.subsquare
+    support = poss.support
+    removed = 0
+    for unit in units:
+        if not 2*size <= unit < 3*size: continue
+        box = unit - 2*size
+        band, stack = box // sub, box % sub
+        for value in range(1, size+1):
+            count = support[unit][value]
+            if count < 2: continue
+            for i in range(sub):
+                row, col = band*sub + i, stack*sub + i
+                if support[3*size + row*sub + stack][value] == count:
+                    removed += removeFrom( sudoku, poss, row, value, table.boxes[box] )
+                if support[3*size + size*sub + col*sub + band][value] == count:
+                    removed += removeFrom( sudoku, poss, size + col, value, table.boxes[box] )
+    return removed
+
+
+# Box-line reduction (claiming): when the blanks of a row (or column) that can hold a value all
+# lie in one box, the value goes in that part of the box and can be removed from the rest of it.
+def boxLineReduction( sudoku, poss, units ):
+    size = sudoku.BoardSize
+    table = getPeers(size)
+    sub = table.subsquare
+    support = poss.support
+    removed = 0
+    for unit in units:
+        if unit >= 2*size: continue
+        for value in range(1, size+1):
+            count = support[unit][value]
+            if count < 2: continue
+            for part in range(sub):
+                if unit < size:     # a row, part is the stack of boxes it crosses
+                    segment = 3*size + unit*sub + part
+                    box = (unit//sub)*sub + part
+                else:               # a column, part is the band of boxes it crosses
+                    segment = 3*size + size*sub + (unit-size)*sub + part
+                    box = part*sub + (unit-size)//sub
+                if support[segment][value] == count:
+                    removed += removeFrom( sudoku, poss, 2*size + box, value, table.units[unit] )
+    return removed
+
+
+# Naked subsets: when k blanks of a unit have only k values between them, those values go in
+# those blanks and can be removed from the other blanks of the unit.
+def nakedSubsets( sudoku, poss, units, k ):
+    size = sudoku.BoardSize
+    removed = 0
+    for unit in units:
+        if unit >= 3*size: continue
+        blanks = unitBlanks( sudoku, unit )
+        small = [ cell for cell in blanks if 2 <= poss.sizes[cell[0]][cell[1]] <= k ]
+        for subset in combinations(small, k):
+            union = 0
+            for row, col in subset: union |= poss[row][col]
+            if popcount(union) != k: continue
+            for row, col in blanks:
+                if (row, col) not in subset and poss[row][col] & union:
+                    for value in maskValues(poss[row][col] & union):
+                        poss.remove( row, col, value )
+                        removed += 1
+    return removed
+
+
+# Hidden subsets: when k values of a unit can only go in the same k blanks, those blanks hold
+# those values and every other value can be removed from them.
+def hiddenSubsets( sudoku, poss, units, k ):
+    size = sudoku.BoardSize
+    support = poss.support
+    removed = 0
+    for unit in units:
+        if unit >= 3*size: continue
+        used = sudoku.unit_used( unit )
+        values = [ value for value in range(1, size+1)
+                   if not used & valueBit(value) and 2 <= support[unit][value] <= k ]
+        if len(values) < k: continue
+        blanks = unitBlanks( sudoku, unit )
+        # for every value, a mask of the blanks (by their place in blanks) that can hold it
+        places = {}
+        for value in values:
+            bit = valueBit(value)
+            places[value] = sum(1 << i for i, (row, col) in enumerate(blanks) if poss[row][col] & bit)
+        for subset in combinations(values, k):
+            union = 0
+            for value in subset: union |= places[value]
+            if popcount(union) != k: continue
+            keep = sum(valueBit(value) for value in subset)
+            for i, (row, col) in enumerate(blanks):
+                if union & (1 << i) and poss[row][col] & ~keep:
+                    for value in maskValues(poss[row][col] & ~keep):
+                        poss.remove( row, col, value )
+                        removed += 1
+    return removed
+
+
+# the rules by name
+RULES = {
+    'pointingPairs': pointingPairs,
+    'boxLineReduction': boxLineReduction,
+    'nakedPairs': lambda sudoku, poss, units: nakedSubsets( sudoku, poss, units, 2 ),
+    'hiddenPairs': lambda sudoku, poss, units: hiddenSubsets( sudoku, poss, units, 2 ),
+    'nakedTriples': lambda sudoku, poss, units: nakedSubsets( sudoku, poss, units, 3 ),
+    'hiddenTriples': lambda sudoku, poss, units: hiddenSubsets( sudoku, poss, units, 3 ),
+}
+
+# every rule, cheapest first
+RULE_ORDER = [ 'pointingPairs', 'boxLineReduction', 'nakedPairs', 'hiddenPairs', 'nakedTriples', 'hiddenTriples' ]
+
+# the rules switched on for a board size, sizes that are not listed run all of RULE_ORDER
+activeRules = {}
+
+# calls, removed candidates and seconds spent for every rule
+ruleStats = dict( (name, [ 0, 0, 0.0 ]) for name in RULES )
+
+
+def rulesFor( size ):
+    return activeRules.get(size, RULE_ORDER)
+
+
+# Runs the rules in order on the given units and stops after the first one that removes
+# something, so the cheaper deductions get the next go. Returns the number removed.
+def applyRules( sudoku, poss, units, rules ):
+    for name in rules:
+        start = time()
+        removed = RULES[name]( sudoku, poss, units )
+        stats = ruleStats[name]
+        stats[0] += 1
+        stats[1] += removed
+        stats[2] += time() - start
+        if removed: return removed
+    return 0
+
+
+def resetRuleStats():
+    for stats in ruleStats.values():
+        stats[:] = [ 0, 0, 0.0 ]
+
+
+def printRuleStats():
+    print '%-18s %10s %10s %10s %14s' % ('rule', 'calls', 'removed', 'seconds', 'removed/sec')
+    for name in RULE_ORDER:
+        calls, removed, seconds = ruleStats[name]
+        if calls:
+            print '%-18s %10d %10d %10.3f %14.0f' % (name, calls, removed, seconds, removed / seconds if seconds else 0)
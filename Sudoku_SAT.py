@@ -0,0 +1,273 @@
+#!/usr/bin/env python
+# A small conflict driven clause learning (CDCL) SAT solver and the CNF encoding of a board.
+#
+# Variables are numbered from 1 and a literal is the int 2*var for var and 2*var+1 for
+# not var, so lit^1 is the negation and every per literal table is a plain list.
+# The solver has the usual parts: two watched literals per clause for unit propagation,
+# first UIP clause learning with non chronological backjumping, VSIDS variable activities
+# (kept in a lazy heap, stale entries are skipped when popped), phase saving and
+# restarts following the Luby sequence.
+import heapq
+from Sudoku_Peers import getPeers
+
+
+# the i-th term (from 1) of the Luby sequence 1 1 2 1 1 2 4 1 1 2 1 1 2 4 8 ...
+def luby( i ):
+    k = 1
+    while (1 << k) - 1 < i: k += 1
+    while (1 << k) - 1 != i:
+        if i >= (1 << (k-1)):
+            i -= (1 << (k-1)) - 1
+            k = 1
+            while (1 << k) - 1 < i: k += 1
+        else:
+            k -= 1
+    return 1 << (k-1)
+
+
+RESTART_UNIT = 100      # conflicts per unit of the Luby sequence
+VAR_DECAY = 0.95        # how fast the activity of variables not in recent conflicts fades
+
+
+class SatSolver:
+
+    def __init__( self, numVars ):
+        self.numVars = numVars
+        self.clauses = []
+        self.watches = [ [] for lit in range(2*numVars+2) ]     # the clauses watching a literal
+        self.value = [ 0 for lit in range(2*numVars+2) ]        # 1 true, -1 false, 0 unassigned
+        self.level = [ 0 for var in range(numVars+1) ]
+        self.reason = [ None for var in range(numVars+1) ]      # the clause that implied a variable
+        self.seen = [ False for var in range(numVars+1) ]
+        self.trail = []
+        self.trailLim = []      # where every decision level starts on the trail
+        self.qhead = 0
+        self.activity = [ 0.0 for var in range(numVars+1) ]
+        self.varInc = 1.0
+        self.polarity = [ 0 for var in range(numVars+1) ]      # the sign a variable was last given
+        self.heap = [ (0.0, var) for var in range(1, numVars+1) ]
+        self.ok = True
+        self.decisions = self.propagations = self.conflicts = self.learnts = self.restarts = 0
+        self.placements = 0     # variables set true, the numChecks of the board solvers
+
+    # adds a clause (a list of literals), clauses of one literal are assigned right away
+    def addClause( self, lits ):
+        lits = list(set(lits))
+        if not self.ok: return False
+        if not lits:
+            self.ok = False
+        elif len(lits) == 1:
+            if self.value[lits[0]] == -1: self.ok = False
+            elif self.value[lits[0]] == 0: self.enqueue( lits[0], None )
+        else:
+            self.watches[lits[0]].append(len(self.clauses))
+            self.watches[lits[1]].append(len(self.clauses))
+            self.clauses.append(lits)
+        return self.ok
+
+    def enqueue( self, lit, reason ):
+        self.value[lit] = 1
+        self.value[lit^1] = -1
+        self.level[lit >> 1] = len(self.trailLim)
+        self.reason[lit >> 1] = reason
+        self.trail.append(lit)
+        if not lit & 1: self.placements += 1
+
+    # Unit propagation with two watched literals. The watched literals of a clause are its first
+    # two, and the literal a clause implies is always put first. Returns a conflicting clause or None.
+    def propagate( self ):
+        trail, value, clauses, watches = self.trail, self.value, self.clauses, self.watches
+        while self.qhead < len(trail):
+            false = trail[self.qhead] ^ 1
+            self.qhead += 1
+            pending = watches[false]
+            watches[false] = kept = []
+            for i in range(len(pending)):
+                index = pending[i]
+                clause = clauses[index]
+                if clause[0] == false: clause[0], clause[1] = clause[1], clause[0]
+                first = clause[0]
+                if value[first] == 1:
+                    kept.append(index)
+                    continue
+                for k in range(2, len(clause)):
+                    if value[clause[k]] != -1:
+                        clause[1], clause[k] = clause[k], false
+                        watches[clause[1]].append(index)
+                        break
+                else:
+                    kept.append(index)
+                    if value[first] == -1:
+                        kept.extend(pending[i+1:])
+                        self.qhead = len(trail)
+                        return index
+                    self.propagations += 1
+                    self.enqueue( first, index )
+        return None
+
+    # First UIP conflict analysis: returns the learnt clause, asserting literal first and a literal
+    # of the level to jump back to second, and that level.
+    def analyze( self, conflict ):
+        trail, level, reason, seen = self.trail, self.level, self.reason, self.seen
+        current = len(self.trailLim)
+        learnt = [ None ]
+        pending = 0
+        lit = None
+        index = len(trail) - 1
+        clause = self.clauses[conflict]
+        while True:
+            for other in (clause if lit is None else clause[1:]):
+                var = other >> 1
+                if not seen[var] and level[var] > 0:
+                    seen[var] = True
+                    self.bumpVar( var )
+                    if level[var] >= current: pending += 1
+                    else: learnt.append(other)
+            while not seen[trail[index] >> 1]: index -= 1
+            lit = trail[index]
+            index -= 1
+            seen[lit >> 1] = False
+            pending -= 1
+            if pending == 0: break
+            clause = self.clauses[reason[lit >> 1]]
+        learnt[0] = lit ^ 1
+        for other in learnt[1:]: seen[other >> 1] = False
+
+        backLevel = 0
+        if len(learnt) > 1:
+            highest = max(range(1, len(learnt)), key=lambda i: level[learnt[i] >> 1])
+            learnt[1], learnt[highest] = learnt[highest], learnt[1]
+            backLevel = level[learnt[1] >> 1]
+        return learnt, backLevel
+
+    # takes back every assignment above a decision level
+    def backtrack( self, target ):
+        if len(self.trailLim) <= target: return
+        value, reason, activity, heap = self.value, self.reason, self.activity, self.heap
+        start = self.trailLim[target]
+        for lit in reversed(self.trail[start:]):
+            var = lit >> 1
+            value[lit] = value[lit^1] = 0
+            reason[var] = None
+            self.polarity[var] = lit & 1
+            heapq.heappush(heap, (-activity[var], var))
+        del self.trail[start:]
+        del self.trailLim[target:]
+        self.qhead = len(self.trail)
+
+    def bumpVar( self, var ):
+        self.activity[var] += self.varInc
+        if self.activity[var] > 1e100:        # rescale, which leaves every heap entry stale
+            self.activity = [ activity * 1e-100 for activity in self.activity ]
+            self.varInc *= 1e-100
+            self.heap = [ (-self.activity[v], v) for v in range(1, self.numVars+1) if self.value[2*v] == 0 ]
+            heapq.heapify(self.heap)
+        elif self.value[2*var] == 0:
+            heapq.heappush(self.heap, (-self.activity[var], var))
+
+    # the unassigned variable with the highest activity, None when every variable is assigned
+    def pickVar( self ):
+        heap, activity, value = self.heap, self.activity, self.value
+        while heap:
+            key, var = heapq.heappop(heap)
+            if value[2*var] == 0 and -key == activity[var]: return var
+        for var in range(1, self.numVars+1):     # only stale entries were left
+            if value[2*var] == 0: return var
+        return None
+
+    # returns True when the clauses are satisfiable, the model is then in value
+    def solve( self ):
+        if not self.ok: return False
+        restartLimit = luby(1) * RESTART_UNIT
+        sinceRestart = 0
+        while True:
+            conflict = self.propagate()
+            if conflict is not None:
+                self.conflicts += 1
+                sinceRestart += 1
+                if not self.trailLim: return False
+                learnt, backLevel = self.analyze( conflict )
+                self.backtrack( backLevel )
+                if len(learnt) == 1:
+                    self.enqueue( learnt[0], None )
+                else:
+                    index = len(self.clauses)
+                    self.clauses.append(learnt)
+                    self.watches[learnt[0]].append(index)
+                    self.watches[learnt[1]].append(index)
+                    self.enqueue( learnt[0], index )
+                self.learnts += 1
+                self.varInc /= VAR_DECAY
+                if sinceRestart >= restartLimit:
+                    self.backtrack( 0 )
+                    self.restarts += 1
+                    sinceRestart = 0
+                    restartLimit = luby(self.restarts + 1) * RESTART_UNIT
+            else:
+                var = self.pickVar()
+                if var is None: return True
+                self.decisions += 1
+                self.trailLim.append(len(self.trail))
+                self.enqueue( 2*var + self.polarity[var], None )
+
+
+# The CNF of a board: a variable for every (row, col, value) that the clues allow, with
+#   at least one value and at most one value (pairwise) in every cell,
+#   every value at least once and at most once (pairwise) in every row, column and box,
+#   a unit clause for every clue.
+# Returns the solver and the (row, col, value) of every variable.
+def encodeBoard( sudoku ):
+    size = sudoku.BoardSize
+    table = getPeers(size)
+    variables = {}
+    cells = [ None ]
+    for row in range(size):
+        for col in range(size):
+            clue = sudoku.get_value( row, col )
+            for value in ([ clue ] if clue else range(1, size+1)):
+                if clue or sudoku.is_consistent( row, col, value ):
+                    variables[(row, col, value)] = len(cells)
+                    cells.append((row, col, value))
+
+    solver = SatSolver( len(cells) - 1 )
+    # at least one and at most one of a group of variables
+    def exactlyOne( group ):
+        solver.addClause([ 2*var for var in group ])
+        for i in range(len(group)):
+            for j in range(i+1, len(group)):
+                solver.addClause([ 2*group[i]+1, 2*group[j]+1 ])
+
+    for row in range(size):
+        for col in range(size):
+            clue = sudoku.get_value( row, col )
+            if clue:
+                solver.addClause([ 2*variables[(row, col, clue)] ])
+            else:
+                exactlyOne([ variables[(row, col, value)] for value in range(1, size+1) if (row, col, value) in variables ])
+    for unit in table.rows + table.cols + table.boxes:
+        for value in range(1, size+1):
+            exactlyOne([ variables[(row, col, value)] for row, col in unit if (row, col, value) in variables ])
+    return solver, cells
+
+
+# solves the board in place with the SAT solver, like the other solvers of Sudoku_Complete.
+# numChecks grows by the values the solver placed, the other counters are in satStats
+satStats = {}
+
+def satSolve( sudoku ):
+    solver, cells = encodeBoard( sudoku )
+    solver.placements = 0
+    try:        # the counters are kept even when the search is interrupted (see iterativeSearch)
+        result = solver.solve()
+    finally:
+        sudoku.numChecks += solver.placements
+        satStats.clear()
+        satStats.update( variables=solver.numVars, clauses=len(solver.clauses), decisions=solver.decisions,
+                         propagations=solver.propagations, conflicts=solver.conflicts,
+                         learnts=solver.learnts, restarts=solver.restarts )
+    if not result: return False
+    for var in range(1, solver.numVars+1):
+        if solver.value[2*var] == 1:
+            row, col, value = cells[var]
+            if sudoku.get_value( row, col ) == 0: sudoku.set_value( row, col, value )
+    return True
@@ -0,0 +1,234 @@
+#!/usr/bin/env python
+# Solves many boards of one size at once with numpy.
+#
+# A batch of B boards is held as arrays: values (B, cells) with 0 for a blank and masks (B, cells)
+# of candidate bitmasks (bit value-1, as in Sudoku_Domains). Every round takes the values used in
+# each row, column and box out of the blanks, places the naked singles and the hidden singles of
+# every unit, and drops the boards that turn out to have no solution, for the whole batch with a
+# few array operations. The boards propagation can't finish are branched on together: every one is
+# replaced by a copy for each value of its blank with the fewest candidates, the copies are
+# propagated as a new batch, and so on until a copy of every board is solved or all its copies
+# failed. Boards with too many copies left are solved one at a time by the MCV search with rule
+# propagation (as MCV_Rules) from where propagation left them.
+# Without numpy, and for boards over VECTOR_MAX_SIZE, every board goes to that search.
+#
+# Usage: python Sudoku_Vector.py [-f format] [-t seconds] file_or_glob ...   (see Sudoku_Reader for the formats)
+import sys, argparse
+from time import time
+import Sudoku_Complete
+from Sudoku_Complete import initialPoss, propagate, iterativeSearch, MCV_Row_Col, \
+                            ascendingValues, ADVANCED_RULES
+from Sudoku_Board import SudokuBoard
+from Sudoku_Reader import readAll, READERS
+from Sudoku_Peers import getPeers
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+BATCH_SIZE = 4096     # most boards propagated together
+BATCH_MEMORY = 256 << 20    # bytes the (copies, cells, size) arrays of 64 bit ints of a batch may take
+BRANCH_LIMIT = 16     # copies of one board branching may hold, a board with more is left to the search
+VECTOR_MAX_SIZE = 9   # bigger boards are searched one at a time, the batch is no faster on them
+
+# what happened to the boards of the last vectorSolve
+vectorStats = { 'boards': 0, 'propagated': 0, 'branched': 0, 'searched': 0, 'unsolvable': 0, 'rounds': 0 }
+
+
+# the arrays of one board size: the cells of every row, column and box, the three units of every
+# cell, the bit of every value (index 0 is the empty bit of a blank) and the units by cells matrix
+# with a 1 where a cell lies in a unit, which counts the cells of every unit with a matrix product
+_tables = {}
+
+def vectorTables( size ):
+    tables = _tables.get(size)
+    if tables is None:
+        table = getPeers(size)
+        units = numpy.array([ [ row*size + col for row, col in unit ] for unit in table.units[:3*size] ])
+        unitsOf = numpy.array([ table.unitsOf[row][col][:3] for row in range(size) for col in range(size) ])
+        bits = numpy.array([ 0 ] + [ 1 << value for value in range(size) ], dtype=numpy.uint64)
+        incidence = numpy.zeros((len(units), size*size), dtype=numpy.float32)
+        for unit, cells in enumerate(units): incidence[unit, cells] = 1
+        tables = _tables[size] = ( units, unitsOf, bits, incidence )
+    return tables
+
+
+# the number of cells of every unit that are set in a (B, values, cells) bool array, as (B, values, units)
+def countUnits( cells, incidence ):
+    boards, values, count = cells.shape
+    counts = numpy.dot(cells.reshape(boards*values, count).astype(numpy.float32), incidence.T)
+    return counts.reshape(boards, values, len(incidence))
+
+
+# Propagates a batch of boards of one size in place until no board changes.
+# values is a (B, cells) int array and masks a (B, cells) uint64 array of candidates.
+# Returns a (B,) bool array, True for the boards shown to have no solution.
+def propagateBatch( values, masks, size ):
+    units, unitsOf, bits, incidence = vectorTables( size )
+    valueBits, zero = bits[1:], numpy.uint64(0)
+    dead = numpy.zeros(len(values), dtype=bool)
+    active = numpy.arange(len(values))
+    while len(active):
+        vectorStats['rounds'] += 1
+        board, mask = values[active], masks[active]
+        blank = board == 0
+
+        # the values used in every unit are taken out of the blanks of the unit
+        placed = bits[board]
+        used = numpy.bitwise_or.reduce(placed[:, units], axis=2)
+        blocked = used[:, unitsOf[:, 0]] | used[:, unitsOf[:, 1]] | used[:, unitsOf[:, 2]]
+        mask = numpy.where(blank, mask & ~blocked, placed)
+
+        # how often every value is placed in and still possible for the blanks of every unit,
+        # as (B, values, units) counts from one matrix product over all boards
+        filled = board[:, None, :] == numpy.arange(1, size+1, dtype=board.dtype)[:, None]
+        possible = ((mask[:, None, :] & valueBits[:, None]) != zero) & blank[:, None, :]
+        filledCounts = countUnits( filled, incidence )
+        openCounts = countUnits( possible, incidence )
+        failed = (filledCounts > 1).any(axis=(1, 2)) | ((filledCounts == 0) & (openCounts == 0)).any(axis=(1, 2))
+
+        # a value missing from a unit with one blank left for it goes to that blank
+        which, value, unit = numpy.nonzero((filledCounts == 0) & (openCounts == 1))
+        if len(which):
+            cells = units[unit, possible[which[:, None], value[:, None], units[unit]].argmax(axis=1)]
+            forced = numpy.full(mask.shape, ~zero, dtype=numpy.uint64)
+            numpy.bitwise_and.at(forced, (which, cells), valueBits[value])
+            mask &= forced
+
+        # blanks with one candidate left get it, blanks with none sink their board
+        failed |= (blank & (mask == zero)).any(axis=1)
+        single = blank & (mask != zero) & ((mask & (mask - numpy.uint64(1))) == zero)
+        board[single] = numpy.log2(mask[single].astype(numpy.float64)).astype(board.dtype) + 1
+
+        changed = (mask != masks[active]).any(axis=1) | single.any(axis=1)
+        values[active], masks[active] = board, mask
+        dead[active[failed]] = True
+        active = active[changed & ~failed]     # a board filled this round is checked once more
+    return dead
+
+
+# Branches on a batch of propagated boards that still have blanks, see the top of the file.
+# The boards solved are filled in in values. Returns a (B,) array holding 1 for the boards solved,
+# -1 for the boards with no solution and 0 for the boards left to the search.
+def branchBatch( values, masks, size ):
+    valueBits = vectorTables( size )[2][1:]
+    status = numpy.zeros(len(values), dtype=numpy.int8)
+    board, mask, owner = values.copy(), masks.copy(), numpy.arange(len(values))
+    left = numpy.zeros(len(values), dtype=bool)
+    while len(owner):
+        # a copy of the board for every candidate of its blank with the fewest
+        possible = (mask[:, :, None] & valueBits) != numpy.uint64(0)
+        counts = possible.sum(axis=2)
+        counts[board != 0] = size + 1
+        cell = counts.argmin(axis=1)
+        which, value = numpy.nonzero(possible[numpy.arange(len(owner)), cell])
+        board, mask, owner, cell = board[which], mask[which], owner[which], cell[which]
+        board[numpy.arange(len(which)), cell] = value + 1
+
+        dead = propagateBatch( board, mask, size )
+        full = ~dead & (board != 0).all(axis=1)
+        for copy in numpy.nonzero(full)[0]:      # the first copy solved answers for its board
+            if status[owner[copy]] == 0:
+                status[owner[copy]] = 1
+                values[owner[copy]] = board[copy]
+        keep = ~dead & ~full & (status[owner] == 0)
+        board, mask, owner = board[keep], mask[keep], owner[keep]
+
+        crowded = numpy.bincount(owner, minlength=len(values)) > BRANCH_LIMIT
+        if crowded.any():
+            left |= crowded
+            keep = ~crowded[owner]
+            board, mask, owner = board[keep], mask[keep], owner[keep]
+
+    status[(status == 0) & ~left] = -1
+    return status
+
+
+# the number of boards of a size propagated together, so that a (copies, cells, size) array of
+# 64 bit ints holding BRANCH_LIMIT copies of each fits in BATCH_MEMORY
+def batchSize( size ):
+    return max(1, min(BATCH_SIZE, BATCH_MEMORY // (BRANCH_LIMIT * size*size*size * 8)))
+
+
+# solves one board (a 2d array [row][col]) as MCV_Rules does, returns the solved rows or None
+def searchBoard( rows, timeLimit ):
+    sudoku = SudokuBoard( len(rows), rows, 0 )
+    poss = initialPoss( sudoku )
+    Sudoku_Complete.start_time = time()
+    vectorStats['searched'] += 1
+    if not ( propagate( sudoku, poss, None, ADVANCED_RULES ) and
+             iterativeSearch( sudoku, poss, MCV_Row_Col, ascendingValues, timeLimit, ADVANCED_RULES ) ): return None
+    return sudoku.CurrentGameboard
+
+
+# Solves a list of boards of one size, each a 2d array [row][col] as parse_file returns it.
+# Returns a list with the solved rows of every board in the same order, None for the boards
+# that have no solution (or ran out of timeLimit in the search).
+def vectorSolve( boards, timeLimit=60 ):
+    vectorStats.update( boards=len(boards), propagated=0, branched=0, searched=0, unsolvable=0, rounds=0 )
+    if numpy is None or ( boards and len(boards[0]) > VECTOR_MAX_SIZE ):
+        solutions = [ searchBoard( rows, timeLimit ) for rows in boards ]
+        vectorStats['unsolvable'] = solutions.count(None)
+        return solutions
+
+    solutions = []
+    size = len(boards[0]) if boards else 1
+    for first in range(0, len(boards), batchSize( size )):
+        batch = boards[first:first+batchSize( size )]
+        values = numpy.array([ [ value for row in rows for value in row ] for rows in batch ],
+                             dtype=numpy.uint8 if size < 256 else numpy.uint16)
+        masks = numpy.full(values.shape, (1 << size) - 1, dtype=numpy.uint64)
+        status = numpy.where(propagateBatch( values, masks, size ), -1, 1).astype(numpy.int8)
+        vectorStats['propagated'] += int((values != 0).all(axis=1).sum())
+        unfinished = numpy.nonzero((status == 1) & (values == 0).any(axis=1))[0]
+        if len(unfinished):
+            openValues = values[unfinished]
+            status[unfinished] = branchBatch( openValues, masks[unfinished], size )
+            values[unfinished] = openValues
+            vectorStats['branched'] += int((status[unfinished] == 1).sum())
+        for board, solved in zip(values, status):
+            rows = board.reshape(size, size).tolist()
+            if solved == 1: solutions.append(rows)
+            elif solved == -1: solutions.append(None)
+            else: solutions.append(searchBoard( rows, timeLimit ))
+    vectorStats['unsolvable'] = solutions.count(None)
+    return solutions
+
+
+# solves the boards of one size and adds vectorStats and the time taken to totals[size]
+def solveChunk( boards, timeLimit, totals ):
+    start = time()
+    vectorSolve( boards, timeLimit )
+    total = totals.setdefault(len(boards[0]), dict.fromkeys(vectorStats.keys() + [ 'seconds' ], 0))
+    for key in vectorStats: total[key] += vectorStats[key]
+    total['seconds'] += time() - start
+
+
+if __name__ == '__main__':
+    from Sudoku_Batch import puzzlePaths
+    parser = argparse.ArgumentParser( description='Solve many boards with vectorized propagation.' )
+    parser.add_argument( 'patterns', nargs='+', help='puzzle files, directories or glob patterns of .sudoku files' )
+    parser.add_argument( '-f', '--format', choices=sorted(READERS), help='the format of every file' )
+    parser.add_argument( '-t', '--time-limit', type=int, default=60, help='seconds per searched board' )
+    args = parser.parse_args()
+
+    # the boards are streamed and solved a batch at a time, so big files take little memory
+    pending, totals = {}, {}
+    for board in readAll( puzzlePaths( args.patterns ), args.format ):
+        boards = pending.setdefault(len(board), [])
+        boards.append(board)
+        if len(boards) == batchSize( len(board) ):
+            solveChunk( boards, args.time_limit, totals )
+            del boards[:]
+    for boards in pending.values():
+        if boards: solveChunk( boards, args.time_limit, totals )
+    if not totals:
+        print 'No boards found'
+        sys.exit(2)
+    for size in sorted(totals):
+        total = totals[size]
+        print '%dx%d: %d boards, %d solved by propagation and %d by branching in %d rounds, %d searched, %d unsolved' % (
+              size, size, total['boards'], total['propagated'], total['branched'], total['rounds'],
+              total['searched'], total['unsolvable'])
+        print '%.2f seconds, %.1f boards per second' % (total['seconds'], total['boards'] / total['seconds'] if total['seconds'] else 0)
@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+# Checks that canonicalForm gives every symmetry of a board the same key, the LRU eviction and
+# counters of SolutionCache, and that cachedSolver maps a cached solution back onto a transformed board.
+#
+# Usage: python -m unittest test_Sudoku_Cache
+import random, unittest
+from Sudoku_Board import SudokuBoard
+from Sudoku_Cache import canonicalForm, rowOrders, SolutionCache, cachedSolver
+
+# clues in the same cells of most boxes: the rows tie in 48 orders and the columns in 48 more
+TIED = [ [ 0, 0, 3, 0, 0, 6, 0, 0, 9 ],
+         [ 0, 0, 0, 0, 0, 0, 0, 0, 0 ],
+         [ 7, 0, 0, 1, 0, 0, 4, 0, 0 ],
+         [ 0, 0, 4, 0, 0, 7, 0, 0, 1 ],
+         [ 0, 0, 0, 0, 0, 0, 0, 0, 0 ],
+         [ 8, 0, 0, 2, 0, 0, 5, 0, 0 ],
+         [ 0, 0, 5, 0, 0, 8, 0, 0, 2 ],
+         [ 0, 0, 0, 0, 0, 0, 0, 0, 0 ],
+         [ 9, 0, 0, 3, 0, 0, 6, 0, 0 ] ]
+
+
+# a solved board, and boards holding its first 20, 25 and 30 cells in row major order as clues
+# (their clue counts differ, so no two of them are the same up to symmetry)
+SOLVED = [ [ (row*3 + row//3 + col) % 9 + 1 for col in range(9) ] for row in range(9) ]
+BOARDS = [ [ [ value if row*9 + col < clues else 0 for col, value in enumerate(line) ]
+             for row, line in enumerate(SOLVED) ] for clues in ( 20, 25, 30 ) ]
+
+
+# true when board is a filled in sudoku keeping the clues of puzzle
+def solves( board, puzzle ):
+    size = len(board)
+    sub = int(round(size ** 0.5))
+    full = set(range(1, size+1))
+    boxes = [ [ board[row][col] for row in range(top, top+sub) for col in range(left, left+sub) ]
+              for top in range(0, size, sub) for left in range(0, size, sub) ]
+    return all( set(unit) == full for unit in board + [ list(column) for column in zip(*board) ] + boxes ) and \
+           all( clue in ( 0, value ) for line, clues in zip(board, puzzle) for value, clue in zip(line, clues) )
+
+
+# board with its bands, rows inside the bands, stacks, columns inside the stacks and values
+# shuffled by rng, and transposed half of the time
+def transformed( board, rng ):
+    size = len(board)
+    sub = int(round(size ** 0.5))
+    def order():
+        return [ block*sub + i for block in rng.sample(range(sub), sub) for i in rng.sample(range(sub), sub) ]
+    rows, cols = order(), order()
+    labels = [ 0 ] + rng.sample(range(1, size+1), size)
+    grid = [ [ labels[board[row][col]] for col in cols ] for row in rows ]
+    return [ list(column) for column in zip(*grid) ] if rng.random() < 0.5 else grid
+
+
+class CanonicalFormTest(unittest.TestCase):
+
+    def test_tied_rows_and_columns(self):
+        self.assertEqual(len(list(rowOrders( TIED, 3 ))), 48)
+        self.assertEqual(len(list(rowOrders( [ list(column) for column in zip(*TIED) ], 3 ))), 48)
+        key = canonicalForm( TIED )[0]
+        rng = random.Random(0)
+        for i in range(20):
+            self.assertEqual(canonicalForm( transformed( TIED, rng ) )[0], key)
+
+
+class SolutionCacheTest(unittest.TestCase):
+
+    def test_evicts_least_recently_used_entry(self):
+        cache = SolutionCache( maxEntries=2 )
+        cache.store( BOARDS[0], SOLVED )
+        cache.store( BOARDS[1], SOLVED )
+        cache.lookup( BOARDS[0] )               # BOARDS[1] is now the least recently used
+        cache.store( BOARDS[2], SOLVED )
+        self.assertIsNone(cache.lookup( BOARDS[1] ))
+        self.assertEqual(cache.lookup( BOARDS[0] ), SOLVED)
+        self.assertEqual(cache.lookup( BOARDS[2] ), SOLVED)
+        self.assertEqual(cache.stats()['evictions'], 1)
+
+    def test_evicts_by_bytes(self):
+        cache = SolutionCache( maxBytes=2 * 2*81 )     # a 9x9 key and its solution take 81 bytes each
+        for board in BOARDS: cache.store( board, SOLVED )
+        self.assertEqual(cache.stats()['entries'], 2)
+        self.assertEqual(cache.stats()['bytes'], 2 * 2*81)
+        self.assertIsNone(cache.lookup( BOARDS[0] ))
+
+    def test_stats(self):
+        cache = SolutionCache()
+        cache.lookup( BOARDS[0] )
+        cache.store( BOARDS[0], SOLVED )
+        cache.lookup( BOARDS[0] )
+        cache.lookup( transformed( BOARDS[0], random.Random(1) ) )
+        self.assertEqual(cache.stats(), { 'hits': 2, 'misses': 1, 'evictions': 0, 'entries': 1, 'bytes': 2*81 })
+
+    def test_cached_solver_maps_solution_back(self):
+        cache = SolutionCache()
+        calls = []
+        def solver( sudoku ):
+            calls.append(sudoku)
+            for row in range(9):
+                for col in range(9): sudoku.set_value( row, col, SOLVED[row][col] )
+            return True
+        solve = cachedSolver( solver, cache )
+        self.assertTrue(solve( SudokuBoard( 9, BOARDS[0], 0 ) ))
+
+        rng = random.Random(2)
+        for i in range(5):
+            puzzle = transformed( BOARDS[0], rng )
+            sudoku = SudokuBoard( 9, puzzle, 0 )
+            self.assertTrue(solve( sudoku ))
+            self.assertTrue(solves( sudoku.CurrentGameboard, puzzle ))
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(cache.stats()['hits'], 5)
+
+
+if __name__ == '__main__':
+    unittest.main()